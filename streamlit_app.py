@@ -1,25 +1,82 @@
 # 导入必要的库
+import csv
 import json
-import pandas as pd
+import hashlib
+import importlib.util
+import os
 import re
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Sequence, Tuple, Optional, Union
 from datetime import datetime
-import zipfile
 import io
+from collections import Counter, OrderedDict, defaultdict, deque
+import threading
 # openpyxl is only required when exporting to Excel. Delay import to the export
 # function to avoid ModuleNotFoundError on app startup when the package is
 # missing in the runtime. If missing, we show a friendly message to the user.
-_OPENPYXL_AVAILABLE = True
+# 只探测是否已安装而不真正导入，真正的导入在写出 Excel 的函数中完成
+_OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+# xlsxwriter 为可选依赖：已安装时优先用它写 Excel（constant_memory 模式逐行落盘），否则使用 openpyxl
+_XLSXWRITER_AVAILABLE = importlib.util.find_spec("xlsxwriter") is not None
+
+# orjson 为可选依赖：可用时用它加速 JSON 解析，未安装时回退到标准库 json
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
+# zstandard 为可选依赖：已安装时"全部导出"的CSV可打包为 .tar.zst，未安装时只提供 ZIP
 try:
-    import openpyxl  # quick availability check
+    import zstandard
 except ModuleNotFoundError:
-    _OPENPYXL_AVAILABLE = False
+    zstandard = None
 
-# 在模块级别导入Streamlit，但不在模块级别使用任何Streamlit函数
-# 这是Streamlit的推荐做法，可以避免某些导入相关的问题
+# 在模块级别导入Streamlit；下方预编译正则用的 st.cache_resource 函数在导入本模块时就会调用
 import streamlit as st
 import time
 
+# 预编译解析用到的正则表达式，避免在解析循环中反复查找 re 的内部缓存
+# Streamlit 每次重跑都会重新执行本脚本的模块级代码，因此用 cache_resource 在所有会话间共享编译结果
+@st.cache_resource
+def _get_compiled_patterns() -> Dict[str, "re.Pattern"]:
+    """编译并返回解析用到的全部正则表达式"""
+    return {
+        # M 函数中的 Item="表名" 形式
+        "item": re.compile(r'Item="([^"]+)"'),
+        # SQL 中的 FROM 表名
+        "from": re.compile(r'FROM\s+([a-zA-Z_][a-zA-Z0-9_]*)', re.IGNORECASE),
+        # Value.NativeQuery(#"实例地址;数据库名", ...)
+        "native_query": re.compile(r'Value\.NativeQuery\(#"([^;]+);([^"]+)"'),
+        # Source = #"实例地址;数据库名"
+        "source": re.compile(r'Source\s*=\s*#"([^;]+);([^"]+)"'),
+        # Schema="数据库名"
+        "schema": re.compile(r'Schema="([^"]+)"'),
+        # Table.RenameColumns(表, {{"old", "new"}, ...}) 的映射列表部分
+        "rename": re.compile(r'Table\.RenameColumns\([^,]+,\s*(\{[^}]*(?:\{[^}]*}[^}]*)*})\)'),
+        # 映射对 {"old", "new"} 或 {old, "new"}：第1组为带引号的旧列名，第2组为不带引号的旧列名
+        "pair": re.compile(r'\{\s*(?:"([^"]+)"|([a-zA-Z_][a-zA-Z0-9_]*))\s*,\s*"([^"]+)"\s*}'),
+        # DAX 中的 '表名' 及其后可选的 [列名]，一次扫描同时得到表和列
+        "table_ref": re.compile(r"'([^']+)'(?:\[([^\]]+)\])?"),
+        # DAX 中的 [度量值名称] 引用
+        "measure_ref": re.compile(r"\[([^\]]+)\]"),
+        # 粘贴内容中连续的空白字符
+        "whitespace": re.compile(r"\s+"),
+    }
+
+_PATTERNS = _get_compiled_patterns()
+_ITEM_RE = _PATTERNS["item"]
+_FROM_RE = _PATTERNS["from"]
+_NATIVE_QUERY_RE = _PATTERNS["native_query"]
+_SOURCE_RE = _PATTERNS["source"]
+_SCHEMA_RE = _PATTERNS["schema"]
+_RENAME_RE = _PATTERNS["rename"]
+_PAIR_RE = _PATTERNS["pair"]
+_TABLE_REF_RE = _PATTERNS["table_ref"]
+_MEASURE_REF_RE = _PATTERNS["measure_ref"]
+_WS_RE = _PATTERNS["whitespace"]
+
+# 粘贴内容中需要移除的不可见控制字符（C0 与 C1 控制字符），供 str.translate 使用
+_CTRL_TABLE = dict.fromkeys([*range(0x00, 0x20), *range(0x7f, 0xa0)])
+
 # 改进的防抖函数 - 简化实现并确保实时响应
 # 使用更直接的方法，确保每次输入变化都能正确触发搜索更新
 # key_prefix: 用于标识不同搜索框的前缀
@@ -39,62 +96,165 @@ def update_search_timer(key_prefix, input_value):
     search_key = f"{key_prefix}_search_term"
     st.session_state[search_key] = input_value  # 直接设置搜索词，实现即时搜索
 
+# 按搜索词过滤标签页表格；搜索词和解析结果都未变化时直接复用本会话上次的筛选结果
+# 命中行在解析结果中的位置（按解析顺序）同时记入 {kind}_filtered_idx，导出该类数据时直接按位置取行，不再重新筛选
+def filter_tab_frame(kind, parsed_id, df, search_blob, search_term):
+    idx_key = f"{kind}_filtered_idx"
+    if not search_term:
+        st.session_state[idx_key] = None
+        return df
+    # 匹配不区分大小写，缓存和导出都以小写搜索词为标识，大小写不同的同一搜索词共用结果
+    term_key = search_term.lower()
+    cache = st.session_state.setdefault("tab_search_cache", {})
+    cache_key = (parsed_id, term_key)
+    cached = cache.get(kind)
+    if cached is None or cached[0] != cache_key:
+        # 各搜索列已预先拼接为小写搜索文本，按字面子串匹配一次即可
+        filtered_df = df[search_blob.str.contains(term_key, regex=False)]
+        # 标签页表格经过排序，但行索引仍是解析结果中的原始位置
+        cached = (cache_key, filtered_df, filtered_df.index.sort_values().to_numpy())
+        cache[kind] = cached
+    # (解析结果标识, 用户输入的搜索词, 小写搜索词, 命中行位置)
+    st.session_state[idx_key] = (parsed_id, search_term, term_key, cached[2])
+    return cached[1]
+
+# 结果表格的显示参数：不滚动可显示的最大行数（即每页行数）、每行高度、表头高度
+_TABLE_MAX_ROWS = 15
+_TABLE_ROW_HEIGHT = 35
+_TABLE_HEADER_HEIGHT = 50
+
+# 表格高度：行数较少时完全自适应显示，超过最大行数时固定为最大高度
+def _tbl_height(n):
+    return min(n, _TABLE_MAX_ROWS) * _TABLE_ROW_HEIGHT + _TABLE_HEADER_HEIGHT
+
+# 分页显示表格：只把当前页的行发送到前端，表格高度按当前页行数自适应
+def paginate_and_show(df, key, column_config=None, page_size=_TABLE_MAX_ROWS):
+    row_count = len(df.index)
+    total_pages = max(1, (row_count + page_size - 1) // page_size)
+    page_key = f"{key}_page"
+    # 筛选后页数变少时，把页码收回到有效范围内
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+    
+    page = 1
+    if total_pages > 1:
+        page = st.number_input("页码", min_value=1, max_value=total_pages, step=1, key=page_key)
+        st.caption(f"第 {page} / {total_pages} 页，每页 {page_size} 条")
+    start = (page - 1) * page_size
+    page_df = df.iloc[start:start + page_size]
+    table_height = _tbl_height(len(page_df.index))
+    
+    try:
+        st.dataframe(
+            page_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config=column_config,
+            key=key,
+            height=table_height
+        )
+    except Exception:
+        # 兼容老版本 Streamlit：如果 column_config 不被支持则降级显示
+        st.dataframe(
+            page_df,
+            use_container_width=True,
+            hide_index=True,
+            key=key,
+            height=table_height
+        )
+
+# 解析结果按列存储（列名 -> 值列表），可直接交给 pd.DataFrame 构造
+_TABLES_COLS = ("表名", "源表名", "表分区数量")
+_COLUMNS_COLS = ("表名", "源表名", "列名", "源列名", "字段格式")
+_MEASURES_COLS = ("度量值名称", "度量值计算逻辑", "度量值数据类型", "度量值文件夹", "度量值涉及表", "度量值涉及列", "度量值引用")
+_RELS_COLS = ("源表名", "源表字段", "目标表名", "目标表字段", "关系类型", "筛选方向", "是否活动")
+_OVERVIEW_COLS = ("表名", "源表名", "列数", "度量值数", "分区数", "实例地址", "数据库名", "协议")
+
+def _loads(content: Union[str, bytes]):
+    """解析JSON内容（str 或 bytes），优先使用 orjson"""
+    # 去掉 UTF-8 BOM（Visual Studio 保存的 .bim 常带 BOM，orjson 不接受）；bytes 用 memoryview 切片避免复制
+    if isinstance(content, str):
+        if content.startswith('\ufeff'):
+            content = content[1:]
+    elif content[:3] == b'\xef\xbb\xbf':
+        content = memoryview(content)[3:]
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson 不支持 NaN、超出64位的整数等写法，交给标准库再试一次
+            pass
+    if isinstance(content, memoryview):
+        content = content.tobytes()
+    return json.loads(content)
+
+# 重复值多、基数低的文本列，构造 DataFrame 时转为 category 以减少内存并加快筛选
+_COLUMNS_CATEGORY_COLS = ("表名", "源表名", "字段格式")
+_MEASURES_CATEGORY_COLS = ("度量值数据类型", "度量值文件夹")
+
+def _empty_columns(fields: Tuple[str, ...]) -> Dict[str, list]:
+    """创建按列存储的空结果"""
+    return {field: [] for field in fields}
+
+def _row_count(columns: Dict[str, list]) -> int:
+    """按列存储结果的行数"""
+    return len(next(iter(columns.values()), []))
+
 class BIMParser:
     """BIM文件解析器"""
     
     def __init__(self):
         self.raw_data = None
-        self.tables_info = []
-        self.columns_info = []
-        self.measures_info = []
-        self.relationships_info = []
-        self.overview_info = []
-    
-    def parse_file(self, file_content: str) -> Dict:
-        """解析BIM文件或TMSL脚本内容"""
+        self.tables_info = _empty_columns(_TABLES_COLS)
+        self.columns_info = _empty_columns(_COLUMNS_COLS)
+        self.measures_info = _empty_columns(_MEASURES_COLS)
+        self.relationships_info = _empty_columns(_RELS_COLS)
+        self.overview_info = _empty_columns(_OVERVIEW_COLS)
+        # 按表名缓存的源表名与连接信息，每次解析只计算一次
+        self._table_source_map = {}
+        self._connection_info_map = {}
+        # 按表名缓存的 Table.RenameColumns 映射（新列名 -> 源列名）
+        self._rename_map_by_table = {}
+        # 分区表达式合并后的文本（按分区对象缓存）
+        self._partition_text_cache = {}
+        # 每个度量值（与 measures_info 行对齐）直接引用的度量值名称，按出现顺序
+        self._direct_refs = []
+        # 每个度量值（与 measures_info 行对齐）表达式中直接涉及的表名集合，供概览统计复用
+        self._measure_involved_tables = []
+        # "表名.列名" -> 源列名，度量值和表关系解析共用
+        self._column_source_lookup = {}
+    
+    def parse_file(self, file_content: Union[str, bytes]) -> Dict:
+        """解析BIM文件或TMSL脚本内容（可直接传入上传文件的原始 UTF-8 字节）"""
+        # 尝试将传入内容解析为 JSON（大部分 .bim / TMSL 为 JSON 格式）
+        # bytes 无需先解码为 str，orjson / json 都能直接解析 UTF-8 字节
+        try:
+            parsed = _loads(file_content)
+        except Exception as e_json:
+            # 返回更友好的错误信息，便于调试上传/粘贴的问题
+            return {"success": False, "error": f"无法解析为JSON: {str(e_json)}"}
+        return self.parse_dict(parsed)
+    
+    def parse_dict(self, parsed) -> Dict:
+        """解析已解码的BIM文件或TMSL脚本JSON对象（调用方已解析过JSON时使用，避免重复解析）"""
         try:
             # 重置解析结果
             self.raw_data = None
-            self.tables_info = []
-            self.columns_info = []
-            self.measures_info = []
-            self.relationships_info = []
-            self.overview_info = []
-
-            # 尝试将传入内容解析为 JSON（大部分 .bim / TMSL 为 JSON 格式）
-            try:
-                parsed = json.loads(file_content)
-            except Exception as e_json:
-                # 返回更友好的错误信息，便于调试上传/粘贴的问题
-                return {"success": False, "error": f"无法解析为JSON: {str(e_json)}"}
+            self.tables_info = _empty_columns(_TABLES_COLS)
+            self.columns_info = _empty_columns(_COLUMNS_COLS)
+            self.measures_info = _empty_columns(_MEASURES_COLS)
+            self.relationships_info = _empty_columns(_RELS_COLS)
+            self.overview_info = _empty_columns(_OVERVIEW_COLS)
+            self._table_source_map = {}
+            self._connection_info_map = {}
+            self._rename_map_by_table = {}
+            self._partition_text_cache = {}
+            self._direct_refs = []
+            self._measure_involved_tables = []
+            self._column_source_lookup = {}
 
             # 试图定位模型对象：多数 .bim / TMSL JSON 包含一个名为 "model" 的子对象
-            def _locate_model(obj):
-                # 直接包含 model 键
-                if isinstance(obj, dict):
-                    if 'model' in obj and isinstance(obj['model'], dict):
-                        return obj['model']
-                    # 常见命名：SemanticModel
-                    if 'SemanticModel' in obj and isinstance(obj['SemanticModel'], dict):
-                        return obj['SemanticModel']
-                    # 如果当前对象看起来就是模型（包含 tables 键）
-                    if 'tables' in obj and isinstance(obj['tables'], list):
-                        return obj
-                    # 递归查找子对象
-                    for v in obj.values():
-                        if isinstance(v, (dict, list)):
-                            found = _locate_model(v)
-                            if found is not None:
-                                return found
-                elif isinstance(obj, list):
-                    for item in obj:
-                        if isinstance(item, (dict, list)):
-                            found = _locate_model(item)
-                            if found is not None:
-                                return found
-                return None
-
-            model_obj = _locate_model(parsed)
+            model_obj = self._locate_model(parsed)
             if model_obj is None:
                 # 如果没有找到模型对象，保留原始解析结果以便错误追踪
                 self.raw_data = parsed
@@ -102,8 +262,12 @@ class BIMParser:
                 # 统一把 raw_data 设置为包含 model 键的结构，方便后续解析函数使用
                 self.raw_data = {'model': model_obj}
 
+            # 预先计算每个表的源表名与连接信息，供后续各解析步骤复用
+            self._build_table_lookups()
+
             # 填充解析信息
             self._parse_tables()
+            self._build_column_source_lookup()
             self._parse_columns()
             self._parse_measures()
             self._parse_relationships()
@@ -111,10 +275,10 @@ class BIMParser:
             self._resolve_all_measure_references()
 
             # 打印调试信息（在控制台可见）
-            print(f"解析结果 - 表数量: {len(self.tables_info)}")
-            print(f"解析结果 - 列数量: {len(self.columns_info)}")
-            print(f"解析结果 - 度量值数量: {len(self.measures_info)}")
-            print(f"解析结果 - 关系数量: {len(self.relationships_info)}")
+            print(f"解析结果 - 表数量: {_row_count(self.tables_info)}")
+            print(f"解析结果 - 列数量: {_row_count(self.columns_info)}")
+            print(f"解析结果 - 度量值数量: {_row_count(self.measures_info)}")
+            print(f"解析结果 - 关系数量: {_row_count(self.relationships_info)}")
 
             return {
                 "success": True,
@@ -128,6 +292,29 @@ class BIMParser:
             print(f"解析错误: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    @staticmethod
+    def _locate_model(obj) -> Optional[dict]:
+        """按层级（广度优先）迭代查找模型对象，找到最浅的模型即返回，不再深入其余子树"""
+        queue = deque([obj])
+        while queue:
+            current = queue.popleft()
+            if isinstance(current, dict):
+                # 直接包含 model 键
+                if 'model' in current and isinstance(current['model'], dict):
+                    return current['model']
+                # 常见命名：SemanticModel
+                if 'SemanticModel' in current and isinstance(current['SemanticModel'], dict):
+                    return current['SemanticModel']
+                # 如果当前对象看起来就是模型（包含 tables 键）
+                if 'tables' in current and isinstance(current['tables'], list):
+                    return current
+                children = current.values()
+            else:
+                children = current
+            # 只把容器类型入队，标量值直接跳过
+            queue.extend(v for v in children if isinstance(v, (dict, list)))
+        return None
+    
     def _parse_tables(self):
         """解析表信息"""
         if "model" not in self.raw_data or "tables" not in self.raw_data["model"]:
@@ -150,59 +337,80 @@ class BIMParser:
                 print(f"排除系统表: {table_name}")
                 continue
                 
-            source_table = "DAX创建"  # 默认值
-            
-            # 查找源表名逻辑
-            if "partitions" in table and table["partitions"]:
-                for partition in table["partitions"]:
-                    if "source" in partition and "expression" in partition["source"]:
-                        expression = partition["source"]["expression"]
-                        source_table = self._extract_source_table(expression)
-                        break
+            source_table = self._table_source_map.get(table_name, "DAX创建")
             
             # 计算分区数量
             partition_count = 0
             if "partitions" in table:
                 partition_count = len(table["partitions"])
             
-            self.tables_info.append({
-                "表名": table_name,
-                "源表名": source_table,
-                "表分区数量": partition_count
-            })
-    
-    def _extract_source_table(self, expression: List[str]) -> str:
-        """从M函数表达式中提取源表名"""
-        if not isinstance(expression, list):
-            return "DAX创建"
-        
-        expression_text = "\n".join(expression)
+            self.tables_info["表名"].append(table_name)
+            self.tables_info["源表名"].append(source_table)
+            self.tables_info["表分区数量"].append(partition_count)
+    
+    def _build_table_lookups(self):
+        """遍历一次所有表，缓存源表名、连接信息和列重命名映射"""
+        if "model" not in self.raw_data or "tables" not in self.raw_data["model"]:
+            return
         
-        # 匹配 M 函数的 Item 方式
-        item_pattern = r'Item="([^"]+)"'
-        item_match = re.search(item_pattern, expression_text)
-        if item_match:
-            return item_match.group(1)
+        for table in self.raw_data["model"]["tables"]:
+            table_name = table.get("name", "")
+            source_table = "DAX创建"
+            connection_info = ("", "")
+            
+            # 以第一个包含表达式的分区为准
+            if "partitions" in table and table["partitions"]:
+                for partition in table["partitions"]:
+                    if "source" in partition and "expression" in partition["source"]:
+                        # 字符串形式的表达式为DAX计算分区，没有源表和连接信息
+                        if isinstance(partition["source"]["expression"], list):
+                            expression_text = self._partition_text(partition)
+                            source_table = self._extract_source_table(expression_text)
+                            connection_info = self._extract_connection_info(expression_text)
+                        break
+            
+            self._table_source_map[table_name] = source_table
+            self._connection_info_map[table_name] = connection_info
+            
+            # 汇总所有分区的列重命名映射；同名表以第一个为准，靠前分区的映射优先
+            if table_name in self._rename_map_by_table:
+                continue
+            rename_map = {}
+            for partition in table.get("partitions", []):
+                if "source" in partition and "expression" in partition["source"]:
+                    for new_name, old_name in self._extract_rename_mappings_from_m(self._partition_text(partition)).items():
+                        rename_map.setdefault(new_name, old_name)
+            self._rename_map_by_table[table_name] = rename_map
+    
+    def _partition_text(self, partition: dict) -> str:
+        """获取分区表达式文本（列表形式按行合并），同一分区只合并一次"""
+        key = id(partition)
+        if key not in self._partition_text_cache:
+            expression = partition["source"]["expression"]
+            self._partition_text_cache[key] = "\n".join(expression) if isinstance(expression, list) else expression
+        return self._partition_text_cache[key]
+    
+    def _extract_source_table(self, expression_text: str) -> str:
+        """从M函数表达式文本中提取源表名"""
+        # 匹配 M 函数的 Item 方式（先用子串判断，不含 Item=" 时不必运行正则）
+        if 'Item="' in expression_text:
+            item_match = _ITEM_RE.search(expression_text)
+            if item_match:
+                return item_match.group(1)
         
-        # 匹配 SQL 的 FROM 语句
-        from_pattern = r'FROM\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-        from_match = re.search(from_pattern, expression_text, re.IGNORECASE)
+        # 匹配 SQL 的 FROM 语句（不区分大小写，没有不额外复制文本的子串预判，直接搜索）
+        from_match = _FROM_RE.search(expression_text)
         if from_match:
             return from_match.group(1)
         
         return "DAX创建"
     
-    def _extract_connection_info(self, expression: List[str]) -> Tuple[str, str]:
-        """从M函数表达式中提取实例地址和数据库名"""
-        if not isinstance(expression, list):
-            return "", ""
-        
-        expression_text = "\n".join(expression)
-        
+    def _extract_connection_info(self, expression_text: str) -> Tuple[str, str]:
+        """从M函数表达式文本中提取实例地址和数据库名"""
+        # 各模式都先用子串判断，文本中不包含关键字时不运行对应的正则
         # 模式1: 匹配 Value.NativeQuery 中的连接字符串格式
         # 例如: Value.NativeQuery(#"MySql/rm-2zeu9er24zw4831e6 mysql rds aliyuncs com:3306;data_mart",...)  
-        native_query_pattern = r'Value\.NativeQuery\(#"([^;]+);([^"]+)"'
-        native_query_match = re.search(native_query_pattern, expression_text)
+        native_query_match = 'Value.NativeQuery(' in expression_text and _NATIVE_QUERY_RE.search(expression_text)
         if native_query_match:
             instance_address = native_query_match.group(1)
             db_name = native_query_match.group(2)
@@ -210,16 +418,14 @@ class BIMParser:
         
         # 模式2: 匹配 Source = #"" 格式
         # 例如: Source = #"MySql/rm-2zeu9er24zw4831e6 mysql rds aliyuncs com:3306;data_mart"
-        source_pattern = r'Source\s*=\s*#"([^;]+);([^"]+)"'
-        source_match = re.search(source_pattern, expression_text)
+        source_match = 'Source' in expression_text and _SOURCE_RE.search(expression_text)
         if source_match:
             instance_address = source_match.group(1)
             db_name = source_match.group(2)
             return instance_address, db_name
         
         # 模式3: 从 Schema 字段中提取数据库名
-        schema_pattern = r'Schema="([^"]+)"'
-        schema_match = re.search(schema_pattern, expression_text)
+        schema_match = 'Schema="' in expression_text and _SCHEMA_RE.search(expression_text)
         if schema_match:
             # 如果找到Schema但没有找到完整的连接信息
             # 尝试只提取数据库名
@@ -228,6 +434,25 @@ class BIMParser:
         
         return "", ""
     
+    def _build_column_source_lookup(self):
+        """构建 "表名.列名" 到源列名的lookup表"""
+        if "model" not in self.raw_data or "tables" not in self.raw_data["model"]:
+            return
+        
+        for table in self.raw_data["model"]["tables"]:
+            table_name = table.get("name", "")
+            
+            for column in table.get("columns", []):
+                column_name = column.get("name", "")
+                source_column = column.get("sourceColumn", column_name)
+                
+                # 优先使用M函数Table.RenameColumns中的源列名
+                m_source_column = self._extract_column_source_from_m_function(table_name, column_name)
+                if m_source_column != column_name:
+                    source_column = m_source_column
+                
+                self._column_source_lookup[f"{table_name}.{column_name}"] = source_column
+    
     def _parse_columns(self):
         """解析列信息"""
         if "model" not in self.raw_data or "tables" not in self.raw_data["model"]:
@@ -237,15 +462,8 @@ class BIMParser:
         
         for table in tables:
             table_name = table.get("name", "")
-            source_table = "DAX创建"
-            
-            # 获取源表名（复用解析逻辑）
-            if "partitions" in table and table["partitions"]:
-                for partition in table["partitions"]:
-                    if "source" in partition and "expression" in partition["source"]:
-                        expression = partition["source"]["expression"]
-                        source_table = self._extract_source_table(expression)
-                        break
+            # 获取源表名（复用预先计算的结果）
+            source_table = self._table_source_map.get(table_name, "DAX创建")
             
             if "columns" in table:
                 for column in table["columns"]:
@@ -266,75 +484,28 @@ class BIMParser:
                     # 字段格式
                     format_string = column.get("formatString", "")
                     
-                    self.columns_info.append({
-                        "表名": table_name,
-                        "源表名": source_table,
-                        "列名": column_name,
-                        "源列名": source_column,
-                        "字段格式": data_type
-                    })
+                    self.columns_info["表名"].append(table_name)
+                    self.columns_info["源表名"].append(source_table)
+                    self.columns_info["列名"].append(column_name)
+                    self.columns_info["源列名"].append(source_column)
+                    self.columns_info["字段格式"].append(data_type)
     
     def _extract_column_source_from_m_function(self, table_name: str, column_name: str) -> str:
-        """从M函数中提取列的源列名"""
-        if "model" not in self.raw_data or "tables" not in self.raw_data["model"]:
-            return column_name
-        
-        tables = self.raw_data["model"]["tables"]
-        
-        # 查找对应的表
-        target_table = None
-        for table in tables:
-            if table.get("name", "") == table_name:
-                target_table = table
-                break
-        
-        if not target_table or "partitions" not in target_table:
-            return column_name
-        
-        # 在所有分区中查找Table.RenameColumns映射
-        for partition in target_table["partitions"]:
-            if "source" in partition and "expression" in partition["source"]:
-                expression = partition["source"]["expression"]
-                
-                # 查找Table.RenameColumns映射
-                rename_mappings = self._extract_rename_mappings_from_m(expression)
-                
-                # 如果找到列名的映射，返回源列名
-                for original_name, source_name in rename_mappings.items():
-                    if original_name == column_name:
-                        return source_name
-        
-        return column_name
+        """从M函数中提取列的源列名（查找预先汇总的Table.RenameColumns映射）"""
+        return self._rename_map_by_table.get(table_name, {}).get(column_name, column_name)
     
     def _extract_rename_mappings_from_m(self, expression: str) -> dict:
         """从M表达式中提取Table.RenameColumns映射"""
         rename_mappings = {}
         
-        # 处理expression可能是列表的情况
-        if isinstance(expression, list):
-            expression = " ".join(expression)
-        
         # 查找Table.RenameColumns模式
         # 模式：Table.RenameColumns(#table(...), {"old1", "new1"}, {"old2", "new2"}, ...)
-        import re
-        
-        # 查找Table.RenameColumns函数调用
-        rename_pattern = r'Table\.RenameColumns\([^,]+,\s*(\{[^}]*(?:\{[^}]*}[^}]*)*})\)'
-        matches = re.findall(rename_pattern, expression)
+        matches = _RENAME_RE.findall(expression)
         
         for match in matches:
-            # 提取映射对
-            mapping_pairs = re.findall(r'\{\s*"([^"]+)"\s*,\s*"([^"]+)"\s*}', match)
-            
-            for old_name, new_name in mapping_pairs:
-                rename_mappings[new_name] = old_name  # 映射是 new -> old
-        
-        # 也尝试匹配不带引号的映射
-        if not rename_mappings:
-            for match in matches:
-                mapping_pairs = re.findall(r'\{\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*,\s*"([^"]+)"\s*}', match)
-                for old_name, new_name in mapping_pairs:
-                    rename_mappings[new_name] = old_name
+            # 提取映射对（旧列名带引号或不带引号均可），映射是 new -> old
+            for quoted_old, bare_old, new_name in _PAIR_RE.findall(match):
+                rename_mappings[new_name] = quoted_old or bare_old
         
         return rename_mappings
     
@@ -343,39 +514,10 @@ class BIMParser:
         if "model" not in self.raw_data or "tables" not in self.raw_data["model"]:
             return
             
-        # 首先构建表名到源表名的lookup表和列名到源列名的lookup表
-        table_source_lookup = {}
-        column_source_lookup = {}
+        # 表名到源表名、列名到源列名的lookup表均已预先计算
+        column_source_lookup = self._column_source_lookup
         tables = self.raw_data["model"]["tables"]
         
-        # 构建表名到源表名的映射
-        for table in tables:
-            table_name = table.get("name", "")
-            source_table = "DAX创建"
-            
-            # 查找源表名逻辑
-            if "partitions" in table and table["partitions"]:
-                for partition in table["partitions"]:
-                    if "source" in partition and "expression" in partition["source"]:
-                        expression = partition["source"]["expression"]
-                        source_table = self._extract_source_table(expression)
-                        break
-            
-            table_source_lookup[table_name] = source_table
-            
-            # 构建列名到源列名的映射
-            if "columns" in table:
-                for column in table["columns"]:
-                    column_name = column.get("name", "")
-                    source_column = column.get("sourceColumn", column_name)
-                    
-                    # 尝试从M函数中获取更准确的源列名
-                    m_source_column = self._extract_column_source_from_m_function(table_name, column_name)
-                    if m_source_column != column_name:
-                        source_column = m_source_column
-                    
-                    column_source_lookup[f"{table_name}.{column_name}"] = source_column
-        
         # 先收集所有度量值信息，用于后续解析引用
         all_measures = []
         for table in tables:
@@ -403,141 +545,132 @@ class BIMParser:
                         "所属表": table_name
                     })
         
-        # 创建度量值查找字典
-        measure_lookup = {measure["度量值名称"]: measure for measure in all_measures}
+        # 创建度量值名称到位置的查找字典（同名度量值以最后一个为准）
+        measure_index = {measure["度量值名称"]: i for i, measure in enumerate(all_measures)}
         
-        # 为每个度量值解析涉及的表、列和引用的度量值
+        # 每个度量值的表达式只扫描一次：直接涉及的表、每个表下的列以及引用的度量值
+        direct_tables = self._measure_involved_tables
+        direct_table_columns = []
+        measure_refs = self._direct_refs
         for measure in all_measures:
+            expression = measure["度量值计算逻辑"]
+            # 匹配 '表名'[列名] 模式，得到 表名 -> 列名集合（只引用表时列集合为空）
+            table_to_cols = defaultdict(set)
+            for table_name, column_name in _TABLE_REF_RE.findall(expression):
+                table_columns = table_to_cols[table_name]
+                if column_name:
+                    table_columns.add(column_name)
+            direct_tables.append(set(table_to_cols))
+            direct_table_columns.append(table_to_cols)
+            measure_refs.append([ref for ref in _MEASURE_REF_RE.findall(expression) if ref in measure_index])
+        
+        # 度量值引用图，按强连通分量合并，循环引用的度量值共享同一结果
+        reference_graph = {name: measure_refs[i] for name, i in measure_index.items()}
+        closure_tables = {}
+        for component in self._measure_reference_components(reference_graph):
+            component_tables = set()
+            for name in component:
+                component_tables |= direct_tables[measure_index[name]]
+                # 分量按逆拓扑序产生，分量外的引用此时已计算完成
+                for ref in reference_graph[name]:
+                    if ref in closure_tables:
+                        component_tables |= closure_tables[ref]
+            for name in component:
+                closure_tables[name] = component_tables
+        
+        # 每个表的显示文本只拼接一次，所有度量值共用（表达式中引用了模型外的表名时按DAX创建显示）
+        table_labels = {t: f"{t} (源表: {source})" for t, source in self._table_source_map.items()}
+        
+        # 为每个度量值汇总涉及的表（包含引用的度量值及其嵌套引用）
+        for i, measure in enumerate(all_measures):
             measure_name = measure["度量值名称"]
             expression = measure["度量值计算逻辑"]
+            table_to_cols = direct_table_columns[i]
             
-            # 提取当前表达式中的表和列
-            current_tables = self._extract_involved_tables(expression)
-            current_columns = self._extract_involved_columns(expression)
-            
-            # 递归查找引用的度量值的DAX逻辑，并合并表和列信息
-            all_tables = set(current_tables)
-            all_columns = set(current_columns)
-            visited_measures = set()  # 避免循环引用
-            
-            def resolve_measure_references(measure_expr):
-                # 查找引用的度量值
-                measure_pattern = r"\[([^\]]+)\]"
-                matches = re.findall(measure_pattern, measure_expr)
-                
-                for match in matches:
-                    # 检查是否是已定义的度量值
-                    if match in measure_lookup and match not in visited_measures:
-                        visited_measures.add(match)
-                        referenced_measure = measure_lookup[match]
-                        # 合并被引用度量值涉及的表和列
-                        ref_tables = self._extract_involved_tables(referenced_measure["度量值计算逻辑"])
-                        ref_columns = self._extract_involved_columns(referenced_measure["度量值计算逻辑"])
-                        all_tables.update(ref_tables)
-                        all_columns.update(ref_columns)
-                        # 递归处理嵌套引用
-                        resolve_measure_references(referenced_measure["度量值计算逻辑"])
-            
-            # 开始递归解析引用
-            resolve_measure_references(expression)
+            all_tables = set(direct_tables[i])
+            for ref in measure_refs[i]:
+                all_tables |= closure_tables[ref]
             
             # 格式化涉及表（使用与表关系页相同的显示方式）
-            formatted_tables = []
-            for table_involved in all_tables:
-                source_table = table_source_lookup.get(table_involved, "DAX创建")
-                formatted_tables.append(f"{table_involved} (源表: {source_table})")
+            formatted_tables = "\n".join(
+                table_labels[t] if t in table_labels else f"{t} (源表: DAX创建)"
+                for t in all_tables
+            )
             
             # 格式化涉及列（使用与表关系页相同的显示方式，从column_source_lookup获取源列名）
-            formatted_columns = []
-            for table_involved in all_tables:
-                # 查找当前表中涉及的列
-                table_related_columns = []
-                for column_involved in all_columns:
-                    # 尝试从DAX表达式中提取列所属的表
-                    # 通过正则表达式匹配 '表名'[列名] 模式
-                    column_pattern = rf"'{re.escape(table_involved)}'\[([^\]]+)\]"
-                    column_matches = re.findall(column_pattern, expression)
-                    
-                    # 检查列是否属于当前表
-                    if column_involved in column_matches:
-                        table_related_columns.append(column_involved)
-                
-                # 为每个列格式化显示，只显示列名和源列
-                for column_involved in table_related_columns:
-                    source_column = column_source_lookup.get(f"{table_involved}.{column_involved}", column_involved)
-                    formatted_columns.append(f"{column_involved} (源列: {source_column})")
+            # 只列出当前表达式中以 '表名'[列名] 形式出现在该表下的列
+            formatted_columns = "\n".join(
+                f"{c} (源列: {column_source_lookup.get(f'{t}.{c}', c)})"
+                for t in all_tables
+                for c in table_to_cols.get(t, ())
+            )
             
-            # 将解析结果添加到最终列表
-            self.measures_info.append({
-                "度量值名称": measure_name,
-                "度量值计算逻辑": expression,
-                "度量值数据类型": measure["度量值数据类型"],
-                "度量值文件夹": measure["度量值文件夹"],
-                "度量值涉及表": "\n".join(formatted_tables),
-                "度量值涉及列": "\n".join(formatted_columns)
-            })
-    
-    def _extract_involved_tables(self, expression: str) -> List[str]:
-        """从DAX表达式中提取涉及的表"""
-        tables = []
-        # 匹配 '表名'[列名] 模式
-        table_pattern = r"'([^']+)'"
-        matches = re.findall(table_pattern, expression)
-        tables.extend(matches)
-        return list(set(tables))
-    
-    def _extract_involved_columns(self, expression: str) -> List[str]:
-        """从DAX表达式中提取涉及的列"""
-        columns = []
-        # 匹配 '表名'[列名] 模式，提取列名
-        column_pattern = r"'[^']+'" + r"\[" + r"'([^']+)'" + r"\]|'[^']+'" + r"\[([^\]]+)\]"
-        matches = re.findall(column_pattern, expression)
-        for match in matches:
-            if isinstance(match, tuple):
-                columns.extend([m for m in match if m])
-            else:
-                columns.append(match)
-        return list(set(columns))
+            # 将解析结果添加到最终结果（度量值引用由 _resolve_all_measure_references 填充）
+            self.measures_info["度量值名称"].append(measure_name)
+            self.measures_info["度量值计算逻辑"].append(expression)
+            self.measures_info["度量值数据类型"].append(measure["度量值数据类型"])
+            self.measures_info["度量值文件夹"].append(measure["度量值文件夹"])
+            self.measures_info["度量值涉及表"].append(formatted_tables)
+            self.measures_info["度量值涉及列"].append(formatted_columns)
+    
+    @staticmethod
+    def _measure_reference_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+        """计算度量值引用图的强连通分量（迭代版Tarjan算法），按逆拓扑序返回"""
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        
+        for root in graph:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph[root]))]
+            
+            while work:
+                node, successors = work[-1]
+                descended = False
+                for succ in successors:
+                    if succ not in index:
+                        index[succ] = lowlink[succ] = len(index)
+                        stack.append(succ)
+                        on_stack.add(succ)
+                        work.append((succ, iter(graph[succ])))
+                        descended = True
+                        break
+                    if succ in on_stack:
+                        lowlink[node] = min(lowlink[node], index[succ])
+                if descended:
+                    continue
+                
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                
+                # node 是分量的根：弹出整个分量
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        
+        return components
     
     def _parse_relationships(self):
         """解析表关系信息"""
         if "model" not in self.raw_data or "relationships" not in self.raw_data["model"]:
             return
             
-        # 首先构建表名到源表名的lookup表
-        table_source_lookup = {}
-        tables = self.raw_data["model"]["tables"]
-        
-        for table in tables:
-            table_name = table.get("name", "")
-            source_table = "DAX创建"
-            
-            # 查找源表名逻辑（复用之前的逻辑）
-            if "partitions" in table and table["partitions"]:
-                for partition in table["partitions"]:
-                    if "source" in partition and "expression" in partition["source"]:
-                        expression = partition["source"]["expression"]
-                        source_table = self._extract_source_table(expression)
-                        break
-            
-            table_source_lookup[table_name] = source_table
-        
-        # 构建列名到源列名的lookup表
-        column_source_lookup = {}
-        for table in tables:
-            table_name = table.get("name", "")
-            
-            if "columns" in table:
-                for column in table["columns"]:
-                    column_name = column.get("name", "")
-                    source_column = column.get("sourceColumn", column_name)
-                    
-                    # 尝试从M函数中获取更准确的源列名
-                    m_source_column = self._extract_column_source_from_m_function(table_name, column_name)
-                    if m_source_column != column_name:
-                        source_column = m_source_column
-                    
-                    column_source_lookup[f"{table_name}.{column_name}"] = source_column
+        # 表名到源表名、列名到源列名的lookup表均已预先计算
+        column_source_lookup = self._column_source_lookup
         
         # 解析关系
         relationships = self.raw_data["model"]["relationships"]
@@ -560,50 +693,31 @@ class BIMParser:
             security_filtering_behavior = "未启用" if is_active is False else "启用"
             
             # 获取源表名
-            from_source_table = table_source_lookup.get(from_table, "DAX创建")
-            to_source_table = table_source_lookup.get(to_table, "DAX创建")
+            from_source_table = self._table_source_map.get(from_table, "DAX创建")
+            to_source_table = self._table_source_map.get(to_table, "DAX创建")
             
             # 获取源列名
             from_source_column = column_source_lookup.get(f"{from_table}.{from_column}", from_column)
             to_source_column = column_source_lookup.get(f"{to_table}.{to_column}", to_column)
             
-            self.relationships_info.append({
-                "源表名": f"{from_table}\n(源表: {from_source_table})",
-                "源表字段": f"{from_column}\n(源列: {from_source_column})",
-                "目标表名": f"{to_table}\n(源表: {to_source_table})",
-                "目标表字段": f"{to_column}\n(源列: {to_source_column})",
-                "关系类型": cardinality,
-                "筛选方向": cross_filtering_behavior,
-                "是否活动": security_filtering_behavior
-            })
+            self.relationships_info["源表名"].append(f"{from_table}\n(源表: {from_source_table})")
+            self.relationships_info["源表字段"].append(f"{from_column}\n(源列: {from_source_column})")
+            self.relationships_info["目标表名"].append(f"{to_table}\n(源表: {to_source_table})")
+            self.relationships_info["目标表字段"].append(f"{to_column}\n(源列: {to_source_column})")
+            self.relationships_info["关系类型"].append(cardinality)
+            self.relationships_info["筛选方向"].append(cross_filtering_behavior)
+            self.relationships_info["是否活动"].append(security_filtering_behavior)
     
     def _resolve_all_measure_references(self):
         """处理所有度量值之间的引用关系"""
-        # 首先创建一个度量值名称到其信息的映射
-        measure_lookup = {}
-        for measure in self.measures_info:
-            measure_lookup[measure["度量值名称"]] = measure
+        # 引用的度量值已在 _parse_measures 中扫描并过滤为已定义的度量值
+        # （假设度量值在表达式中以 [度量值名称] 格式出现，没有表限定的就是度量值）
+        measure_references = []
+        for refs in self._direct_refs:
+            # 去重并保留出现顺序，将引用的度量值信息添加到当前度量值中
+            measure_references.append("\n".join(dict.fromkeys(refs)))
         
-        # 更新每个度量值，添加对其他度量值的引用信息
-        for measure in self.measures_info:
-            expression = measure["度量值计算逻辑"]
-            referenced_measures = []
-            
-            # 查找引用的度量值（假设度量值在表达式中以 [度量值名称] 格式出现）
-            measure_pattern = r"\[([^\]]+)\]"
-            matches = re.findall(measure_pattern, expression)
-            
-            for match in matches:
-                # 排除可能的列引用（通过上下文判断）
-                # 这里简化处理，假设没有表限定的就是度量值
-                if match in measure_lookup and match not in referenced_measures:
-                    referenced_measures.append(match)
-            
-            # 将引用的度量值信息添加到当前度量值中
-            if referenced_measures:
-                measure["度量值引用"] = "\n".join(referenced_measures)
-            else:
-                measure["度量值引用"] = ""
+        self.measures_info["度量值引用"] = measure_references
     
     def _generate_overview(self):
         """生成模型概览信息"""
@@ -613,27 +727,10 @@ class BIMParser:
         # 获取所有表的信息
         tables = self.raw_data["model"].get("tables", [])
         
-        # 首先解析所有度量值，收集每个表涉及的度量值
-        table_measure_counts = {}
-        for table in tables:
-            table_name = table.get("name", "")
-            # 初始化每个表的度量值计数为0
-            table_measure_counts[table_name] = 0
-        
-        # 计算每个表相关的度量值数量
-        for table in tables:
-            if "measures" in table:
-                for measure in table["measures"]:
-                    expression = measure.get("expression", "")
-                    # 处理数组格式的expression
-                    if isinstance(expression, list):
-                        expression = " ".join(expression)
-                    # 提取涉及的表
-                    involved_tables = self._extract_involved_tables(expression)
-                    # 如果度量值涉及此表，则将该表的度量值计数加1
-                    for involved_table in involved_tables:
-                        if involved_table in table_measure_counts:
-                            table_measure_counts[involved_table] += 1
+        # 计算每个表相关的度量值数量：直接复用 _parse_measures 中提取的涉及表，不再重新扫描表达式
+        table_measure_counts = Counter()
+        for involved_tables in self._measure_involved_tables:
+            table_measure_counts.update(involved_tables)
         
         # 生成概览信息
         for table in tables:
@@ -643,56 +740,288 @@ class BIMParser:
             column_count = len(table.get("columns", []))
             partition_count = len(table.get("partitions", []))
             
-            # 获取源表名和连接信息
-            source_table = "DAX创建"
-            instance_address = ""
-            database_name = ""
-            protocol = ""
+            # 获取源表名和连接信息（实例地址和数据库名）
+            source_table = self._table_source_map.get(table_name, "DAX创建")
+            instance_address, database_name = self._connection_info_map.get(table_name, ("", ""))
             
-            if "partitions" in table and table["partitions"]:
-                for partition in table["partitions"]:
-                    if "source" in partition and "expression" in partition["source"]:
-                        expression = partition["source"]["expression"]
-                        source_table = self._extract_source_table(expression)
-                        # 提取实例地址和数据库名
-                        instance_address, database_name = self._extract_connection_info(expression)
-                        # 提取协议类型
-                        if instance_address and '/' in instance_address:
-                            protocol = instance_address.split('/')[0]
-                        break
+            # 提取协议类型
+            protocol = ""
+            if instance_address and '/' in instance_address:
+                protocol = instance_address.split('/')[0]
             
             # 获取该表涉及的度量值数量
             measure_count = table_measure_counts.get(table_name, 0)
             
-            self.overview_info.append({
-                "表名": table_name,
-                "源表名": source_table,
-                "列数": column_count,
-                "度量值数": measure_count,
-                "分区数": partition_count,
-                "实例地址": instance_address,
-                "数据库名": database_name,
-                "协议": protocol
-            })
+            self.overview_info["表名"].append(table_name)
+            self.overview_info["源表名"].append(source_table)
+            self.overview_info["列数"].append(column_count)
+            self.overview_info["度量值数"].append(measure_count)
+            self.overview_info["分区数"].append(partition_count)
+            self.overview_info["实例地址"].append(instance_address)
+            self.overview_info["数据库名"].append(database_name)
+            self.overview_info["协议"].append(protocol)
 
-def create_streamlit_app():
-    """创建Streamlit应用"""
-    # 设置页面配置
-    st.set_page_config(
-        page_title="BI模型解析工具",
-        page_icon="📊",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
-    
-    # 添加全局CSS样式
-    st.markdown("""
+@st.cache_data(show_spinner=False)
+def _parse_bim_cached(parsed_id: str, _file_bytes: bytes) -> dict:
+    """解析上传的BIM文件；按文件内容的 blake2b 摘要缓存结果，相同文件重复解析直接命中缓存"""
+    parser = BIMParser()
+    return parser.parse_file(_file_bytes)
+
+# 各标签页表格的构造方式：(排序列, 转为 category 的列, 转为整数的列, 搜索框匹配的列)
+_TAB_FRAME_SPECS = {
+    "overview": ("表名", (), ("列数", "度量值数", "分区数"), ("表名", "表描述", "源表名", "数据库名")),
+    "columns": ("表名", _COLUMNS_CATEGORY_COLS, (), ("表名", "列名", "源列名")),
+    "measures": ("度量值涉及表", _MEASURES_CATEGORY_COLS, (), ("度量值名称", "度量值计算逻辑")),
+    "relationships": ("源表名", (), (), ("源表名", "目标表名", "源表字段", "目标表字段")),
+}
+
+def _parsed_data_id(content: Union[str, bytes]) -> str:
+    """根据解析内容生成解析结果的标识，内容相同的解析结果可共用标签页表格缓存"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+@st.cache_data(show_spinner=False)
+def _build_tab_frame(parsed_id: str, kind: str, _records: Dict[str, list]):
+    """构造排序并添加序号后的标签页表格及其搜索文本；按解析结果标识缓存，搜索等重跑不再重复构造"""
+    import pandas as pd
+    sort_col, category_cols, int_cols, search_cols = _TAB_FRAME_SPECS[kind]
+    df = pd.DataFrame(_records)
+    if df.empty:
+        return df, pd.Series(dtype=object)
+    if category_cols:
+        df = df.astype({col: "category" for col in category_cols})
+    # 确保数值列为数值类型，避免按字符串排序
+    for num_col in int_cols:
+        if num_col in df.columns:
+            df[num_col] = pd.to_numeric(df[num_col], errors='coerce').fillna(0).astype(int)
+    df = df.sort_values(by=sort_col, ascending=True)
+    # 添加序号列
+    df.insert(0, '序号', range(1, len(df) + 1))
+    
+    # 搜索文本：各搜索列以 \x1f 分隔拼接后转小写，与表格行索引对齐
+    # 使用 pyarrow 字符串类型（Streamlit 自带依赖），str.contains 由 Arrow 的向量化内核执行
+    search_parts = [df[col].astype(str) for col in search_cols if col in df.columns]
+    search_blob = search_parts[0]
+    for part in search_parts[1:]:
+        search_blob = search_blob + "\x1f" + part
+    return df, search_blob.str.lower().astype("string[pyarrow]")
+
+@st.cache_resource
+def _make_column_configs(kind: str, columns: Tuple[str, ...]) -> dict:
+    """生成标签页表格的列宽和列类型配置；只与列集合有关，按列名缓存，所有会话共用"""
+    column_configs = {}
+    for col in columns:
+        if kind != "overview":
+            # 序号列配置为数字类型，确保正确排序；其余列统一为中等宽度文本
+            if col == '序号':
+                column_configs[col] = st.column_config.NumberColumn(col, width="small")
+            else:
+                column_configs[col] = st.column_config.TextColumn(col, width="medium")
+        elif col in ['序号', '列数', '度量值数', '分区数']:
+            # 数值列配置为数字类型，确保按数值排序
+            column_configs[col] = st.column_config.NumberColumn(col, width="small")
+        elif col in ['表名', '表描述', '实例地址', '数据库名', '源表名']:
+            column_configs[col] = st.column_config.TextColumn(col, width="medium")
+        else:
+            column_configs[col] = st.column_config.TextColumn(col, width="small")
+    return column_configs
+
+# 渲染一个结果标签页：实时搜索框、按搜索词过滤、统计信息和分页表格，返回筛选后的表格
+# stats_fmt 根据筛选后的表格生成统计信息文本
+def _render_tab(parsed_id, kind, records, search_label, search_prefix, table_key, stats_fmt, empty_message):
+    # 已排序并添加序号列的表格及其搜索文本（按解析结果缓存）
+    df, search_blob = _build_tab_frame(parsed_id, kind, records)
+    if df.empty:
+        st.warning(empty_message)
+        return
+    
+    # 实时搜索功能 - 无需按回车键，输入时自动搜索
+    input_value = st.text_input(search_label, key=f"{search_prefix}_input")
+    
+    # 直接更新搜索状态，无需等待回车
+    update_search_timer(search_prefix, input_value)
+    
+    # 根据搜索词过滤，支持空搜索（显示所有数据）
+    search_term = debounced_search(search_prefix)
+    df = filter_tab_frame(kind, parsed_id, df, search_blob, search_term)
+    
+    # 显示统计信息或筛选结果数量
+    st.info(stats_fmt(df))
+    
+    # 配置列的宽度和类型（按列名缓存），分页显示表格
+    column_configs = _make_column_configs(kind, tuple(df.columns))
+    paginate_and_show(df, table_key, column_configs)
+
+@st.cache_data(show_spinner=False)
+def _build_export_frame(parsed_id: str, kind: str, _records: Dict[str, list]):
+    """构造单类导出用的表格（保持解析顺序并添加序号列）；按解析结果标识缓存，重复导出直接命中缓存"""
+    import numpy as np
+    import pandas as pd
+    # 序号列直接作为首列参与构造，用 int32 连续数组，避免 insert 再复制一次表格
+    serial = np.arange(1, _row_count(_records) + 1, dtype=np.int32)
+    return pd.DataFrame({'序号': serial, **_records})
+
+# 导出时每次写入的行数，每写完一块回报一次进度
+_EXPORT_CHUNK_ROWS = 10_000
+
+def _row_chunks(columns: Dict[str, list], on_rows: Optional[Callable[[int], None]] = None):
+    """把按列存储的数据按 _EXPORT_CHUNK_ROWS 行分块，逐块产出行元组；每块处理完后把行数回报给 on_rows"""
+    total = _row_count(columns)
+    for start in range(0, total, _EXPORT_CHUNK_ROWS):
+        stop = min(start + _EXPORT_CHUNK_ROWS, total)
+        yield zip(*(values[start:stop] for values in columns.values()))
+        if on_rows is not None:
+            on_rows(stop - start)
+
+def _xlsx_bytes(sheets: List[Tuple[str, Dict[str, list]]], on_rows: Optional[Callable[[int], None]] = None) -> bytes:
+    """逐行写出 Excel，每个工作表对应一份按列存储的数据，不经过 DataFrame"""
+    if _XLSXWRITER_AVAILABLE:
+        return _xlsx_bytes_xlsxwriter(sheets, on_rows)
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for sheet_name, columns in sheets:
+        worksheet = workbook.create_sheet(sheet_name[:31])
+        worksheet.append(list(columns))
+        for rows in _row_chunks(columns, on_rows):
+            for row in rows:
+                worksheet.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+# 文本原样写入单元格，不把以"="开头的表达式或网址转换成公式/超链接
+_XLSXWRITER_OPTIONS = {"strings_to_formulas": False, "strings_to_urls": False}
+
+def _xlsx_bytes_xlsxwriter(sheets: List[Tuple[str, Dict[str, list]]], on_rows: Optional[Callable[[int], None]] = None) -> bytes:
+    """以 xlsxwriter constant_memory 模式写出 Excel，每行写完即落盘，内存占用与行数无关"""
+    import xlsxwriter
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True, **_XLSXWRITER_OPTIONS})
+    for sheet_name, columns in sheets:
+        worksheet = workbook.add_worksheet(sheet_name[:31])
+        worksheet.write_row(0, 0, list(columns))
+        row_idx = 1
+        for rows in _row_chunks(columns, on_rows):
+            for row in rows:
+                worksheet.write_row(row_idx, 0, row)
+                row_idx += 1
+    workbook.close()
+    return output.getvalue()
+
+# 导出数据类型 -> 解析结果中的数据键（同时是"全部导出"时各工作表/CSV文件的名称与顺序）
+_EXPORT_KINDS = {"表明细": "overview", "列明细": "columns", "度量值": "measures", "表关系": "relationships"}
+_XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# 全部导出为CSV压缩包时：总行数不超过该值直接存储不压缩；临时文件超过该大小后写入磁盘
+_ZIP_STORED_MAX_ROWS = 1000
+_ZIP_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+def _write_csv(text, columns: Dict[str, list], on_rows: Optional[Callable[[int], None]] = None) -> None:
+    """把按列存储的数据分块逐行写成CSV（表头 + 数据行）"""
+    writer = csv.writer(text, lineterminator=os.linesep)
+    writer.writerow(list(columns))
+    for rows in _row_chunks(columns, on_rows):
+        writer.writerows(rows)
+
+def _tar_zst_bytes(sheet_data: List[Tuple[str, Dict[str, list]]], on_rows: Optional[Callable[[int], None]] = None) -> bytes:
+    """把各工作表的CSV打成 tar 流并用 zstd 压缩，返回 .tar.zst 文件内容"""
+    import tarfile
+    output = io.BytesIO()
+    mtime = int(time.time())
+    compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+    with compressor.stream_writer(output, closefd=False) as zst:
+        with tarfile.open(fileobj=zst, mode='w|') as tar:
+            for sheet_name, sheet_rows in sheet_data:
+                # tar 成员头需要预先知道大小，因此每个CSV先在内存中生成
+                text = io.StringIO()
+                _write_csv(text, sheet_rows, on_rows)
+                payload = text.getvalue().encode('utf-8')
+                info = tarfile.TarInfo(f"{sheet_name}.csv")
+                info.size = len(payload)
+                info.mtime = mtime
+                tar.addfile(info, io.BytesIO(payload))
+    return output.getvalue()
+
+# 导出结果缓存保留的条目数
+_EXPORT_CACHE_MAX_ENTRIES = 8
+
+# 导出时要在函数内部更新外部创建的进度条，st.cache_data 的元素重放不允许这样做，
+# 因此导出结果改用 cache_resource 上的一个按最近使用淘汰的字典缓存，所有会话共用
+@st.cache_resource
+def _get_export_cache() -> Tuple[threading.Lock, "OrderedDict[tuple, Tuple[bytes, str]]"]:
+    """导出结果缓存及保护它的锁"""
+    return threading.Lock(), OrderedDict()
+
+def _build_export_bytes(parsed_id: str, export_type: str, export_format: str, data: dict, use_zstd: bool = False,
+                        on_rows: Optional[Callable[[int], None]] = None,
+                        row_filter: Optional[Tuple[str, Sequence[int]]] = None) -> Tuple[bytes, str]:
+    """按 (解析结果标识, 导出类型, 导出格式, 是否zstd, 搜索词) 缓存导出文件内容及其MIME类型，重复导出直接返回已生成的字节；
+    未命中时才生成，on_rows 接收每块写完的行数，用于显示进度；row_filter 为 (搜索词, 命中行位置)，只导出这些行"""
+    lock, cache = _get_export_cache()
+    key = (parsed_id, export_type, export_format, use_zstd, row_filter[0] if row_filter is not None else None)
+    with lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    result = _generate_export_bytes(parsed_id, export_type, export_format, data, use_zstd, on_rows,
+                                    row_filter[1] if row_filter is not None else None)
+    with lock:
+        cache[key] = result
+        while len(cache) > _EXPORT_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+    return result
+
+def _generate_export_bytes(parsed_id: str, export_type: str, export_format: str, data: dict, use_zstd: bool,
+                           on_rows: Optional[Callable[[int], None]], row_idx: Optional[Sequence[int]] = None) -> Tuple[bytes, str]:
+    """生成导出文件内容及其MIME类型"""
+    if export_type == "全部导出":
+        sheet_data = [(sheet_name, data[kind]) for sheet_name, kind in _EXPORT_KINDS.items()]
+        if export_format == "CSV" and use_zstd:
+            return _tar_zst_bytes(sheet_data, on_rows), "application/zstd"
+        if export_format == "CSV":
+            # 打包用到的模块只在导出时才导入，不拖慢页面的首次加载
+            import tempfile
+            import zipfile
+            # 行数很少时直接存储不压缩；否则使用最快的 deflate 级别，导出的文本表格不需要最高压缩率
+            total_rows = sum(_row_count(sheet_rows) for _, sheet_rows in sheet_data)
+            compression = zipfile.ZIP_STORED if total_rows <= _ZIP_STORED_MAX_ROWS else zipfile.ZIP_DEFLATED
+            # 压缩包先写入临时文件，超过阈值后落盘，避免大模型导出时整个压缩包常驻内存
+            with tempfile.SpooledTemporaryFile(max_size=_ZIP_SPOOL_MAX_SIZE) as zip_buffer:
+                with zipfile.ZipFile(zip_buffer, mode='w', compression=compression, compresslevel=1) as zf:
+                    for sheet_name, sheet_rows in sheet_data:
+                        # 按列存储的数据直接逐行写入压缩包成员，不经过 DataFrame 和完整的 CSV 字符串
+                        with zf.open(f"{sheet_name}.csv", 'w') as raw:
+                            with io.TextIOWrapper(raw, encoding='utf-8', newline='') as text:
+                                _write_csv(text, sheet_rows, on_rows)
+                zip_buffer.seek(0)
+                return zip_buffer.read(), "application/zip"
+        # write_only 模式逐行写入，避免为每个工作表先构造 DataFrame 和完整的单元格对象
+        return _xlsx_bytes(sheet_data, on_rows), _XLSX_MIME
+    
+    # 导出特定类型（表明细/列明细/度量值/表关系），添加序号后的表格按解析结果缓存
+    kind = _EXPORT_KINDS[export_type]
+    export_df = _build_export_frame(parsed_id, kind, data[kind])
+    if row_idx is not None:
+        # 只导出页面上搜索命中的行（保持解析顺序），序号重新从 1 开始
+        import numpy as np
+        export_df = export_df.iloc[row_idx].assign(序号=np.arange(1, len(row_idx) + 1, dtype=np.int32))
+    if export_format == "CSV":
+        # 分块直接写入字节缓冲区，不先生成完整的 CSV 字符串再整体编码；空表也要写出表头
+        buffer = io.BytesIO()
+        total_rows = len(export_df)
+        for start in range(0, max(total_rows, 1), _EXPORT_CHUNK_ROWS):
+            chunk = export_df.iloc[start:start + _EXPORT_CHUNK_ROWS]
+            chunk.to_csv(buffer, index=False, header=start == 0, encoding="utf-8")
+            if on_rows is not None:
+                on_rows(len(chunk))
+        return buffer.getvalue(), "text/csv"
+    # 与全部导出共用逐行分块写入的 Excel 路径，写完每块回报进度
+    columns = {col: export_df[col].tolist() for col in export_df.columns}
+    return _xlsx_bytes([("Sheet1", columns)], on_rows), _XLSX_MIME
+
+# 全局CSS样式，每次运行时注入页面
+_GLOBAL_CSS = """
     <style>
-    /* 侧边栏样式优化 */
-    [data-testid="stSidebar"] {
-        background-color: #f8f9fa;
-    }
-    
     /* 文件上传区域样式优化 */
     [data-testid="stFileUploader"] {
         border: 2px dashed #0066cc;
@@ -703,7 +1032,6 @@ def create_streamlit_app():
     
     /* 标题样式优化 */
     h1, h2, h3, h4 {
-        color: #1a1a1a;
         font-weight: bold;
         font-family: 'Microsoft YaHei', Arial, sans-serif;
     }
@@ -716,16 +1044,9 @@ def create_streamlit_app():
         font-weight: bold !important;
     }
     
-    /* 设置Streamlit根容器和主内容区域背景为黑色 */
-    [data-testid="stApp"] {
-        background-color: #000000 !important;
-    }
-    
-    [data-testid="stAppViewContainer"] {
-        background-color: #000000 !important;
-    }
-    
-    /* 设置侧边栏背景为黑色 */
+    /* 设置Streamlit根容器、主内容区域和侧边栏背景为黑色 */
+    [data-testid="stApp"],
+    [data-testid="stAppViewContainer"],
     [data-testid="stSidebar"] {
         background-color: #000000 !important;
     }
@@ -783,22 +1104,7 @@ def create_streamlit_app():
         border-color: #555555 !important;
     }
     
-    /* 确保侧边栏折叠和展开按键始终显示 - 包括所有状态 */
-    /* 折叠按钮 (向右箭头) */
-    [data-testid="stIconMaterial"][data-testid="collapsedControl"] {
-        color: #ffffff !important;
-        opacity: 1 !important;
-        display: block !important;
-    }
-    
-    /* 展开按钮 (向左箭头) */
-    [data-testid="stIconMaterial"][data-testid="expandedControl"] {
-        color: #ffffff !important;
-        opacity: 1 !important;
-        display: block !important;
-    }
-    
-    /* 确保所有stIconMaterial图标始终可见 */
+    /* 确保侧边栏折叠和展开按键等所有stIconMaterial图标始终可见 */
     [data-testid="stIconMaterial"] {
         color: #ffffff !important;
         opacity: 1 !important;
@@ -840,147 +1146,61 @@ def create_streamlit_app():
         font-size: 14px;
         /* 确保整个表格容器左对齐 */
         display: block !important;
-        text-align: left !important;
     }
     
-    /* 重点：确保所有页面所有表格的单元格内容靠左对齐 */
-    /* 直接针对所有表格单元格内容的样式，最高优先级 */
-    [data-testid="stDataFrame"] tbody td,
-    [data-testid="stTable"] tbody td,
-    [data-testid="columns_table"] tbody td,
-    [data-testid="measures_table"] tbody td,
-    [data-testid="relationships_table"] tbody td,
-    table tbody td {
-        text-align: left !important;
-        text-align-last: left !important;
-        /* 确保文本内容靠左 */
-        justify-content: flex-start !important;
-        align-items: flex-start !important;
-        /* 确保单元格内部元素靠左 */
-        display: table-cell !important;
-        /* 重置可能的display属性 */
-        vertical-align: top !important;
-        /* 确保内容从左侧开始 */
-        padding-left: 8px !important;
-        padding-right: 8px !important;
-    }
-    
-    /* 确保所有页面单元格内所有内容元素靠左 */
-    [data-testid="stDataFrame"] td *,
-    [data-testid="stTable"] td *,
-    [data-testid="columns_table"] td *,
-    [data-testid="measures_table"] td *,
-    [data-testid="relationships_table"] td *,
-    table td * {
+    /* 重点：确保所有页面所有表格及数据显示相关组件靠左对齐 */
+    [data-testid="stDataFrame"], [data-testid="stTable"],
+    .stDataFrame, .stTable,
+    [data-baseweb="table"],
+    ._StyledTable,
+    .data-table,
+    .table-wrapper,
+    .streamlit-expanderHeader,
+    table {
         text-align: left !important;
-        text-align-last: left !important;
-        justify-content: flex-start !important;
-        align-items: flex-start !important;
-        display: inline !important;
-        /* 确保内容元素保持内联状态 */
     }
     
-    /* 表格内部所有元素左对齐 - 覆盖所有页面 */
-    [data-testid="stDataFrame"] *, 
-    [data-testid="stTable"] *, 
-    [data-testid="columns_table"] *, 
-    [data-testid="measures_table"] *, 
-    [data-testid="relationships_table"] *, 
+    /* 表格内部所有元素左对齐 */
+    [data-testid="stDataFrame"] *,
+    [data-testid="stTable"] *,
     table * {
         text-align: left !important;
         justify-content: flex-start !important;
         align-items: flex-start !important;
     }
     
-    /* 表格主体内容左对齐 - 覆盖所有页面 */
-    [data-testid="stDataFrame"] tbody, 
-    [data-testid="stTable"] tbody,
-    [data-testid="columns_table"] tbody,
-    [data-testid="measures_table"] tbody,
-    [data-testid="relationships_table"] tbody,
-    table tbody {
-        text-align: left !important;
-    }
-    
-    [data-testid="stDataFrame"] tbody tr, 
-    [data-testid="stTable"] tbody tr,
-    [data-testid="columns_table"] tbody tr,
-    [data-testid="measures_table"] tbody tr,
-    [data-testid="relationships_table"] tbody tr,
-    table tbody tr {
-        text-align: left !important;
-    }
-    
-    /* 针对Streamlit的表格底层实现 - 覆盖所有页面 */
-    .dataframe, 
-    .dataframe tbody, 
-    .dataframe tr, 
-    .dataframe td, 
-    .dataframe th {
-        text-align: left !important;
-        text-align-last: left !important;
-    }
-    
-    /* 针对pandas表格的额外样式 - 覆盖所有页面 */
-    .stDataFrame, .stTable {
-        text-align: left !important;
-    }
-    
-    .stDataFrame td, .stTable td {
-        text-align: left !important;
+    /* 单元格内容（包括最后一行文本）靠左 */
+    .dataframe,
+    .dataframe th,
+    table td,
+    table td * {
         text-align-last: left !important;
     }
     
-    /* 防止Streamlit默认样式覆盖 - 覆盖所有页面 */
-    [data-baseweb="table"] {
-        text-align: left !important;
-    }
-    
+    /* 单元格顶部对齐，保持表格单元格布局 */
+    table td,
     [data-baseweb="table"] td {
-        text-align: left !important;
-        text-align-last: left !important;
         display: table-cell !important;
         vertical-align: top !important;
     }
     
-    [data-baseweb="table"] tbody td {
-        text-align: left !important;
-        text-align-last: left !important;
-        display: table-cell !important;
-        vertical-align: top !important;
+    table tbody td {
+        padding-left: 8px !important;
+        padding-right: 8px !important;
     }
     
-    /* 针对不同页面的特定表格ID */
-    [data-testid="columns_table"], 
-    [data-testid="measures_table"], 
-    [data-testid="relationships_table"] {
-        text-align: left !important;
-        width: 100% !important;
-        display: block !important;
+    /* 确保单元格内的内容元素保持内联状态 */
+    table td * {
+        display: inline !important;
     }
     
     /* 确保所有表格中所有文本内容靠左 */
     [data-testid="stDataFrame"] text,
-    [data-testid="stTable"] text,
-    [data-testid="columns_table"] text,
-    [data-testid="measures_table"] text,
-    [data-testid="relationships_table"] text {
+    [data-testid="stTable"] text {
         text-anchor: start !important;
         dominant-baseline: hanging !important;
     }
     
-    /* 确保Streamlit的内部表格组件靠左 */
-    ._StyledTable {
-        text-align: left !important;
-    }
-    
-    /* 确保所有数据显示相关组件靠左 */
-    .data-table,
-    .table-wrapper,
-    .streamlit-expanderHeader {
-        text-align: left !important;
-    }
-    
     /* 滚动条样式优化 */
     ::-webkit-scrollbar {
         width: 8px;
@@ -1000,12 +1220,87 @@ def create_streamlit_app():
     ::-webkit-scrollbar-thumb:hover {
         background: #a1a1a1;
     }
+    
+    /* 侧边栏数据导出区域：紧凑布局和较小字号 */
+    .export-sidebar * {
+        font-size: 0.75rem !important;
+        margin-bottom: 0 !important;
+        margin-top: 0 !important;
+        line-height: 1.1;
+    }
+    .export-sidebar .stVerticalBlock {
+        gap: 0 !important;
+    }
+    .export-sidebar .stButton button {
+        height: 28px !important;
+        padding: 0.1rem 0.3rem !important;
+        margin-top: 0 !important;
+        margin-bottom: 0 !important;
+    }
+    .export-sidebar .stAlert {
+        margin-top: 0 !important;
+        margin-bottom: 0 !important;
+        padding: 0.2rem !important;
+        font-size: 0.7rem !important;
+    }
+    .export-sidebar .stSelectbox {
+        margin-bottom: 0 !important;
+        margin-top: 0 !important;
+        padding: 0 !important;
+    }
+    .export-sidebar h3 {
+        font-size: 0.7rem !important;
+        margin-bottom: 0 !important;
+    }
+    .export-sidebar {
+        font-size: 0.75rem !important;
+        margin-top: -15px !important;
+        padding: 0 !important;
+        line-height: 1.0 !important;
+    }
+    .export-sidebar > *:first-child {
+        margin-top: 0 !important;
+    }
+    .export-sidebar .stLabel {
+        margin-bottom: 0 !important;
+        margin-top: 0 !important;
+    }
+    .export-sidebar .stMarkdown {
+        margin-bottom: 0 !important;
+        margin-top: 0 !important;
+    }
+    .export-sidebar .stSelectbox div[data-baseweb="select"] {
+        margin-top: 0 !important;
+        margin-bottom: 0 !important;
+    }
+    .export-sidebar .stButton {
+        margin-top: 0 !important;
+        margin-bottom: 0 !important;
+    }
+    
+    .stSidebar [data-testid='stVerticalBlock'] {
+        gap: 0.2rem;
+    }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def create_streamlit_app():
+    """创建Streamlit应用"""
+    # 设置页面配置
+    st.set_page_config(
+        page_title="BI模型解析工具",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    # 添加全局CSS样式（每次重跑都需重新注入，否则样式会随页面重绘消失）
+    st.markdown(_GLOBAL_CSS, unsafe_allow_html=True)
     
     # 初始化会话状态
     if 'parsed_data' not in st.session_state:
         st.session_state['parsed_data'] = None
+        st.session_state['parsed_data_id'] = None
     
     # 侧边栏
     with st.sidebar:
@@ -1064,51 +1359,34 @@ def create_streamlit_app():
                     if pasted_content.strip():
                         try:
                             # 更全面的粘贴内容清理
-                            # 1. 移除首尾空白字符
-                            cleaned_content = pasted_content.strip()
-                            
-                            # 2. 移除所有BOM标记
-                            if cleaned_content.startswith('\ufeff'):
-                                cleaned_content = cleaned_content[1:]
-                            
-                            # 3. 移除可能存在的前导/尾随垃圾字符
-                            # 查找第一个'{'和最后一个'}'来确保只保留JSON部分
-                            if '{' in cleaned_content and '}' in cleaned_content:
-                                start_idx = cleaned_content.find('{')
-                                end_idx = cleaned_content.rfind('}') + 1
-                                cleaned_content = cleaned_content[start_idx:end_idx]
+                            # 1~3. 查找第一个'{'和最后一个'}'来确保只保留JSON部分，
+                            # 一次切片同时移除首尾空白字符、BOM标记和前导/尾随垃圾字符；
+                            # find / rfind 分别从两端查找，找到即停止，无需先整串 strip 复制一份
+                            start_idx = pasted_content.find('{')
+                            end_idx = pasted_content.rfind('}')
+                            if start_idx != -1 and end_idx > start_idx:
+                                cleaned_content = pasted_content[start_idx:end_idx + 1]
+                            else:
+                                # 没有成对的大括号时，只移除首尾空白字符和BOM标记
+                                cleaned_content = pasted_content.strip().lstrip('\ufeff')
                             
                             # 4. 处理可能的空白字符编码问题
-                            import re
                             # 移除不可见的控制字符
-                            cleaned_content = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned_content)
+                            cleaned_content = cleaned_content.translate(_CTRL_TABLE)
                             # 标准化空白字符
-                            cleaned_content = re.sub(r'\s+', ' ', cleaned_content)
+                            cleaned_content = _WS_RE.sub(' ', cleaned_content)
                             
                             st.info(f"📋 处理后的内容长度: {len(cleaned_content)} 字符")
                             st.info(f"📋 内容开头: {cleaned_content[:50]}...")
                             
-                            # 验证内容是否为有效的JSON格式
-                            try:
-                                json.loads(cleaned_content)
-                                st.success("✅ JSON格式验证通过！")
-                            except json.JSONDecodeError as je:
-                                st.error(f"❌ 无效的JSON格式: {str(je)}")
-                                st.info("💡 提示：")
-                                st.info("1. 请确保粘贴的是完整的TMSL脚本内容")
-                                st.info("2. 检查是否有多余的字符或格式问题")
-                                st.info("3. 尝试重新复制文件内容")
-                                # 显示更多调试信息
-                                if len(cleaned_content) < 500:
-                                    st.code(cleaned_content, language="json")
-                                return
-                            
-                            # 解析粘贴的内容
+                            # 解析粘贴的内容：不再单独预先验证JSON，parse_file 只解析一次，
+                            # 格式无效时直接返回包含错误信息的失败结果
                             parser = BIMParser()
                             result = parser.parse_file(cleaned_content)
                             
                             if result["success"]:
                                 st.session_state['parsed_data'] = result
+                                st.session_state['parsed_data_id'] = _parsed_data_id(cleaned_content)
                                 st.success("✅ 内容解析成功！")
                                 st.session_state["show_paste_dialog"] = False
                                 # 强制刷新页面以显示解析结果
@@ -1116,6 +1394,12 @@ def create_streamlit_app():
                             else:
                                 st.error(f"❌ 内容解析失败: {result['error']}")
                                 st.info("💡 请检查粘贴的内容是否为有效的TMSL脚本格式")
+                                st.info("1. 请确保粘贴的是完整的TMSL脚本内容")
+                                st.info("2. 检查是否有多余的字符或格式问题")
+                                st.info("3. 尝试重新复制文件内容")
+                                # 显示更多调试信息
+                                if len(cleaned_content) < 500:
+                                    st.code(cleaned_content, language="json")
                         except Exception as e:
                             st.error(f"❌ 处理内容时出错: {str(e)}")
                             st.info("💡 请尝试重新复制完整的模型文件内容")
@@ -1140,15 +1424,16 @@ def create_streamlit_app():
     # 处理文件解析
     if parse_button and uploaded_file is not None:
         try:
-            # 读取文件内容
-            file_content = uploaded_file.getvalue().decode("utf-8")
+            # 读取文件内容（原始字节直接交给解析器，避免再解码出一份 str）
+            file_content = uploaded_file.getvalue()
             
-            # 解析文件
-            parser = BIMParser()
-            result = parser.parse_file(file_content)
+            # 解析文件（按文件内容摘要缓存，摘要只计算一次，同时用作标签页表格的缓存标识）
+            parsed_id = _parsed_data_id(file_content)
+            result = _parse_bim_cached(parsed_id, file_content)
             
             if result["success"]:
                 st.session_state['parsed_data'] = result
+                st.session_state['parsed_data_id'] = parsed_id
                 st.success("✅ 文件解析成功！")
             else:
                 st.error(f"❌ 文件解析失败: {result['error']}")
@@ -1158,6 +1443,7 @@ def create_streamlit_app():
     # 显示解析结果
     if st.session_state['parsed_data'] is not None:
         data = st.session_state['parsed_data']
+        parsed_id = st.session_state['parsed_data_id']
         
         # 创建标签页
         tab1, tab2, tab3, tab4 = st.tabs([
@@ -1168,656 +1454,148 @@ def create_streamlit_app():
         ])
         
         with tab1:
-            overview_df = pd.DataFrame(data['overview'])
-
-            if not overview_df.empty:
-                # 确保数值列为数值类型，避免按字符串排序
-                for _num_col in ['列数', '度量值数', '分区数']:
-                    if _num_col in overview_df.columns:
-                        overview_df[_num_col] = pd.to_numeric(overview_df[_num_col], errors='coerce').fillna(0).astype(int)
-
-                # 按表名列字母升序排序
-                overview_df = overview_df.sort_values(by='表名', ascending=True)
-                # 添加序号列
-                overview_df.insert(0, '序号', range(1, len(overview_df) + 1))
-                
-                # 实时搜索功能 - 无需按回车键，输入时自动搜索
-                input_value = st.text_input(
-                    "🔍 搜索表名或表描述", 
-                    key="table_search_input"
-                )
-                
-                # 直接更新搜索状态，无需等待回车
-                update_search_timer("table_search", input_value)
-                
-                # 获取搜索词
-                search_term = debounced_search("table_search")
-                
-                # 根据搜索词过滤，支持空搜索（显示所有数据）
-                if search_term:
-                    # 构建搜索条件，确保列存在时才进行搜索
-                    search_conditions = []
-                    
-                    # 表名搜索
-                    if '表名' in overview_df.columns:
-                        search_conditions.append(overview_df['表名'].str.contains(search_term, case=False, na=False))
-                    
-                    # 表描述搜索 - 安全处理可能不存在的列
-                    if '表描述' in overview_df.columns:
-                        search_conditions.append(overview_df['表描述'].str.contains(search_term, case=False, na=False))
-                    
-                    # 源表名搜索
-                    if '源表名' in overview_df.columns:
-                        search_conditions.append(overview_df['源表名'].str.contains(search_term, case=False, na=False))
-                    
-                    # 数据库名搜索
-                    if '数据库名' in overview_df.columns:
-                        search_conditions.append(overview_df['数据库名'].str.contains(search_term, case=False, na=False))
-                    
-                    # 只有当有搜索条件时才进行过滤
-                    if search_conditions:
-                        # 使用逻辑或组合所有条件
-                        combined_condition = search_conditions[0]
-                        for cond in search_conditions[1:]:
-                            combined_condition = combined_condition | cond
-                        
-                        overview_df = overview_df[combined_condition]
-                
-                # 计算统计信息
-                # 表总数：所有表名的除重计数
-                table_count = len(set(overview_df['表名']))
-                
-                # 列总数：每个表的列名除重计数加总
-                # 从columns_info中获取数据
-                columns_data = data.get('columns', [])
-                column_count = len(columns_data)
-                
-                # 度量值总数：度量值名称除重计数加总
-                measures_data = data.get('measures', [])
-                measure_count = len(measures_data)
-                
-                # 关系条数：表关系的总数
-                relationships_data = data.get('relationships', [])
-                relationship_count = len(relationships_data)
-                
-                # 显示概览信息
-                st.info(f"📊 统计信息: 表总数 {table_count} 个, 列总数 {column_count} 个, 度量值总数 {measure_count} 个, 关系条数 {relationship_count} 个")
-                
-                # 配置列的宽度和类型
-                column_configs = {}
-                for col in overview_df.columns:
-                    if col in ['序号', '列数', '度量值数', '分区数']:
-                        # 数值列配置为数字类型，确保按数值排序
-                        column_configs[col] = st.column_config.NumberColumn(
-                            col,
-                            width="small"
-                        )
-                    elif col in ['表名', '表描述', '实例地址']:
-                        column_configs[col] = st.column_config.TextColumn(
-                            col,
-                            width="medium"
-                        )
-                    elif col in ['行数', '协议']:
-                        column_configs[col] = st.column_config.TextColumn(
-                            col,
-                            width="small"
-                        )
-                    elif col in ['数据库名', '源表名']:
-                        column_configs[col] = st.column_config.TextColumn(
-                            col,
-                            width="medium"
-                        )
-                    else:
-                        column_configs[col] = st.column_config.TextColumn(
-                            col,
-                            width="small"
-                        )
-                
-                # 设置表格高度 - 自适应行数，只有超过15行时才需要滚动
-                max_rows_without_scroll = 15  # 不滚动可显示的最大行数
-                row_height = 35  # 每行高度
-                header_height = 50  # 表头高度
-                
-                if len(overview_df) <= max_rows_without_scroll:
-                    # 如果行数较少，完全自适应显示
-                    table_height = len(overview_df) * row_height + header_height
-                else:
-                    # 超过最大行数时，设置最大高度
-                    table_height = max_rows_without_scroll * row_height + header_height
-                
-                # 显示表格
-                try:
-                    st.dataframe(
-                        overview_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config=column_configs,
-                        key="overview_table",
-                        height=table_height
-                    )
-                except Exception:
-                    # 兼容老版本 Streamlit：如果 column_config 不被支持则降级显示
-                    st.dataframe(
-                        overview_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        key="overview_table",
-                        height=table_height
-                    )
-            else:
-                st.warning("⚠️ 没有找到概览数据")
+            # 统计信息：表总数为当前筛选结果中表名的除重计数，列、度量值和关系为解析结果的总数（按列存储）
+            _render_tab(
+                parsed_id, "overview", data['overview'],
+                search_label="🔍 搜索表名或表描述",
+                search_prefix="table_search",
+                table_key="overview_table",
+                stats_fmt=lambda df: (
+                    f"📊 统计信息: 表总数 {df['表名'].nunique()} 个, "
+                    f"列总数 {_row_count(data.get('columns', {}))} 个, "
+                    f"度量值总数 {_row_count(data.get('measures', {}))} 个, "
+                    f"关系条数 {_row_count(data.get('relationships', {}))} 个"
+                ),
+                empty_message="⚠️ 没有找到概览数据",
+            )
         
         with tab2:
-            columns_df = pd.DataFrame(data['columns'])
-            
-            if not columns_df.empty:
-                # 按表名列字母升序排序
-                columns_df = columns_df.sort_values(by='表名', ascending=True)
-                # 添加序号列
-                columns_df.insert(0, '序号', range(1, len(columns_df) + 1))
-                
-                # 实时搜索功能 - 使用防抖优化性能
-                input_value = st.text_input(
-                    "🔍 搜索表名、列名或源列名", 
-                    key="column_search_input",
-                    on_change=lambda: update_search_timer("column_search", st.session_state.column_search_input)
-                )
-                
-                # 初始化时也需要更新一次定时器
-                update_search_timer("column_search", input_value)
-                
-                # 获取经过防抖处理的搜索词
-                debounced_term = debounced_search("column_search")
-                
-                # 如果有防抖处理后的搜索词，则执行搜索
-                if debounced_term:
-                    # 构建搜索条件，确保列存在时才进行搜索
-                    search_conditions = []
-                    
-                    # 表名搜索
-                    if '表名' in columns_df.columns:
-                        search_conditions.append(columns_df['表名'].str.contains(debounced_term, case=False, na=False))
-                    
-                    # 列名搜索
-                    if '列名' in columns_df.columns:
-                        search_conditions.append(columns_df['列名'].str.contains(debounced_term, case=False, na=False))
-                    
-                    # 源列名搜索
-                    if '源列名' in columns_df.columns:
-                        search_conditions.append(columns_df['源列名'].str.contains(debounced_term, case=False, na=False))
-                    
-                    # 只有当有搜索条件时才进行过滤
-                    if search_conditions:
-                        # 使用逻辑或组合所有条件
-                        combined_condition = search_conditions[0]
-                        for cond in search_conditions[1:]:
-                            combined_condition = combined_condition | cond
-                        
-                        columns_df = columns_df[combined_condition]
-                
-                # 显示筛选结果数量
-                st.info(f"📝 共显示 {len(columns_df)} 条列记录")
-                
-                # 设置表格高度 - 自适应行数，只有超过15行时才需要滚动
-                max_rows_without_scroll = 15  # 不滚动可显示的最大行数
-                row_height = 35  # 每行高度
-                header_height = 50  # 表头高度
-                
-                if len(columns_df) <= max_rows_without_scroll:
-                    # 如果行数较少，完全自适应显示
-                    table_height = len(columns_df) * row_height + header_height
-                else:
-                    # 超过最大行数时，设置最大高度
-                    table_height = max_rows_without_scroll * row_height + header_height
-                
-                # 配置列的宽度和类型
-                column_configs = {}
-                for col in columns_df.columns:
-                    if col == '序号':
-                        # 序号列配置为数字类型，确保正确排序
-                        column_configs[col] = st.column_config.NumberColumn(
-                            col,
-                            width="small"
-                        )
-                    else:
-                        column_configs[col] = st.column_config.TextColumn(
-                            col,
-                            width="medium"
-                        )
-                
-                # 显示表格
-                try:
-                    st.dataframe(
-                        columns_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config=column_configs,
-                        key="columns_table",
-                        height=table_height
-                    )
-                except Exception:
-                    st.dataframe(
-                        columns_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        key="columns_table",
-                        height=table_height
-                    )
-            else:
-                st.warning("⚠️ 没有找到列数据")
+            _render_tab(
+                parsed_id, "columns", data['columns'],
+                search_label="🔍 搜索表名、列名或源列名",
+                search_prefix="column_search",
+                table_key="columns_table",
+                stats_fmt=lambda df: f"📝 共显示 {len(df)} 条列记录",
+                empty_message="⚠️ 没有找到列数据",
+            )
         
         with tab3:
-            measures_df = pd.DataFrame(data['measures'])
-            
-            if not measures_df.empty:
-                # 按度量值涉及表列字母升序排序
-                measures_df = measures_df.sort_values(by='度量值涉及表', ascending=True)
-                # 添加序号列
-                measures_df.insert(0, '序号', range(1, len(measures_df) + 1))
-                
-                # 实时搜索功能 - 无需按回车键，输入时自动搜索
-                input_value = st.text_input(
-                    "🔍 搜索度量值名称或计算逻辑", 
-                    key="measure_search_input"
-                )
-                
-                # 直接更新搜索状态，无需等待回车
-                update_search_timer("measure_search", input_value)
-                
-                # 获取搜索词
-                search_term = debounced_search("measure_search")
-                
-                # 根据搜索词过滤，支持空搜索（显示所有数据）
-                if search_term:
-                    # 构建搜索条件，确保列存在时才进行搜索
-                    search_conditions = []
-                    
-                    # 度量值名称搜索
-                    if '度量值名称' in measures_df.columns:
-                        search_conditions.append(measures_df['度量值名称'].str.contains(search_term, case=False, na=False))
-                    
-                    # 度量值计算逻辑搜索
-                    if '度量值计算逻辑' in measures_df.columns:
-                        search_conditions.append(measures_df['度量值计算逻辑'].str.contains(search_term, case=False, na=False))
-                    
-                    # 只有当有搜索条件时才进行过滤
-                    if search_conditions:
-                        # 使用逻辑或组合所有条件
-                        combined_condition = search_conditions[0]
-                        for cond in search_conditions[1:]:
-                            combined_condition = combined_condition | cond
-                        
-                        measures_df = measures_df[combined_condition]
-                
-                # 显示筛选结果数量
-                st.info(f"📈 共显示 {len(measures_df)} 条度量值记录")
-                
-                # 设置表格高度 - 自适应行数，只有超过15行时才需要滚动
-                max_rows_without_scroll = 15  # 不滚动可显示的最大行数
-                row_height = 35  # 每行高度
-                header_height = 50  # 表头高度
-                
-                if len(measures_df) <= max_rows_without_scroll:
-                    # 如果行数较少，完全自适应显示
-                    table_height = len(measures_df) * row_height + header_height
-                else:
-                    # 超过最大行数时，设置最大高度
-                    table_height = max_rows_without_scroll * row_height + header_height
-                
-                # 配置列的宽度和类型
-                column_configs = {}
-                for col in measures_df.columns:
-                    if col == '序号':
-                        # 序号列配置为数字类型，确保正确排序
-                        column_configs[col] = st.column_config.NumberColumn(
-                            col,
-                            width="small"
-                        )
-                    else:
-                        column_configs[col] = st.column_config.TextColumn(
-                            col,
-                            width="medium"
-                        )
-                
-                # 显示表格
-                try:
-                    st.dataframe(
-                        measures_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config=column_configs,
-                        key="measures_table",
-                        height=table_height
-                    )
-                except Exception:
-                    st.dataframe(
-                        measures_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        key="measures_table",
-                        height=table_height
-                    )
-            else:
-                st.warning("⚠️ 没有找到度量值数据")
+            _render_tab(
+                parsed_id, "measures", data['measures'],
+                search_label="🔍 搜索度量值名称或计算逻辑",
+                search_prefix="measure_search",
+                table_key="measures_table",
+                stats_fmt=lambda df: f"📈 共显示 {len(df)} 条度量值记录",
+                empty_message="⚠️ 没有找到度量值数据",
+            )
         
         with tab4:
-            relationships_df = pd.DataFrame(data['relationships'])
-            
-            if not relationships_df.empty:
-                # 按源表名列字母升序排序
-                relationships_df = relationships_df.sort_values(by='源表名', ascending=True)
-                # 添加序号列
-                relationships_df.insert(0, '序号', range(1, len(relationships_df) + 1))
-                
-                # 实时搜索功能 - 无需按回车键，输入时自动搜索
-                input_value = st.text_input(
-                    "🔍 搜索表名或字段名", 
-                    key="relationship_search_input"
-                )
-                
-                # 直接更新搜索状态，无需等待回车
-                update_search_timer("relationship_search", input_value)
-                
-                # 获取搜索词
-                search_term = debounced_search("relationship_search")
-                
-                # 根据搜索词过滤，支持空搜索（显示所有数据）
-                if search_term:
-                    # 构建搜索条件，确保列存在时才进行搜索
-                    search_conditions = []
-                    
-                    # 源表名搜索
-                    if '源表名' in relationships_df.columns:
-                        search_conditions.append(relationships_df['源表名'].str.contains(search_term, case=False, na=False))
-                    
-                    # 目标表名搜索
-                    if '目标表名' in relationships_df.columns:
-                        search_conditions.append(relationships_df['目标表名'].str.contains(search_term, case=False, na=False))
-                    
-                    # 源表字段搜索
-                    if '源表字段' in relationships_df.columns:
-                        search_conditions.append(relationships_df['源表字段'].str.contains(search_term, case=False, na=False))
-                    
-                    # 目标表字段搜索
-                    if '目标表字段' in relationships_df.columns:
-                        search_conditions.append(relationships_df['目标表字段'].str.contains(search_term, case=False, na=False))
-                    
-                    # 只有当有搜索条件时才进行过滤
-                    if search_conditions:
-                        # 使用逻辑或组合所有条件
-                        combined_condition = search_conditions[0]
-                        for cond in search_conditions[1:]:
-                            combined_condition = combined_condition | cond
-                        
-                        relationships_df = relationships_df[combined_condition]
-                
-                # 显示筛选结果数量
-                st.info(f"🔗 共显示 {len(relationships_df)} 条关系记录")
-                
-                # 设置表格高度 - 自适应行数，只有超过15行时才需要滚动
-                max_rows_without_scroll = 15  # 不滚动可显示的最大行数
-                row_height = 35  # 每行高度
-                header_height = 50  # 表头高度
-                
-                if len(relationships_df) <= max_rows_without_scroll:
-                    # 如果行数较少，完全自适应显示
-                    table_height = len(relationships_df) * row_height + header_height
-                else:
-                    # 超过最大行数时，设置最大高度
-                    table_height = max_rows_without_scroll * row_height + header_height
-                
-                # 配置列的宽度和类型
-                column_configs = {}
-                for col in relationships_df.columns:
-                    if col == '序号':
-                        # 序号列配置为数字类型，确保正确排序
-                        column_configs[col] = st.column_config.NumberColumn(
-                            col,
-                            width="small"
-                        )
-                    else:
-                        column_configs[col] = st.column_config.TextColumn(
-                            col,
-                            width="medium"
-                        )
-                
-                # 显示表格
-                try:
-                    st.dataframe(
-                        relationships_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config=column_configs,
-                        key="relationships_table",
-                        height=table_height
-                    )
-                except Exception:
-                    st.dataframe(
-                        relationships_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        key="relationships_table",
-                        height=table_height
-                    )
-            else:
-                st.warning("⚠️ 没有找到关系数据")
+            _render_tab(
+                parsed_id, "relationships", data['relationships'],
+                search_label="🔍 搜索表名或字段名",
+                search_prefix="relationship_search",
+                table_key="relationships_table",
+                stats_fmt=lambda df: f"🔗 共显示 {len(df)} 条关系记录",
+                empty_message="⚠️ 没有找到关系数据",
+            )
             
             # 恢复导出功能 - 添加到侧边栏，并优化样式
             with st.sidebar.expander("📤 数据导出", expanded=False):
-                # 添加CSS样式优化布局和字体大小
-                st.markdown(
-                    """
-                    <style>
-                        .export-sidebar * {
-                            font-size: 0.75rem !important;
-                            margin-bottom: 0 !important;
-                            margin-top: 0 !important;
-                            line-height: 1.1;
-                        }
-                        .export-sidebar .stVerticalBlock {
-                            gap: 0 !important;
-                        }
-                        .export-sidebar .stButton button {
-                            height: 28px !important;
-                            padding: 0.1rem 0.3rem !important;
-                            margin-top: 0 !important;
-                            margin-bottom: 0 !important;
-                        }
-                        .export-sidebar .stAlert {
-                            margin-top: 0 !important;
-                            margin-bottom: 0 !important;
-                            padding: 0.2rem !important;
-                            font-size: 0.7rem !important;
-                        }
-                        .export-sidebar .stSelectbox {
-                            margin-bottom: 0 !important;
-                            margin-top: 0 !important;
-                            padding: 0 !important;
-                        }
-                        .export-sidebar h3 {
-                            font-size: 0.7rem !important;
-                            margin-bottom: 0 !important;
-                        }
-                        .export-sidebar {
-                            font-size: 0.75rem !important;
-                            margin-top: -15px !important;
-                            padding: 0 !important;
-                            line-height: 1.0 !important;
-                        }
-                        .export-sidebar > *:first-child {
-                            margin-top: 0 !important;
-                        }
-                        .export-sidebar .stLabel {
-                            margin-bottom: 0 !important;
-                            margin-top: 0 !important;
-                        }
-                        .export-sidebar .stMarkdown {
-                            margin-bottom: 0 !important;
-                            margin-top: 0 !important;
-                        }
-                        .export-sidebar .stSelectbox div[data-baseweb="select"] {
-                            margin-top: 0 !important;
-                            margin-bottom: 0 !important;
-                        }
-                        .export-sidebar .stButton {
-                            margin-top: 0 !important;
-                            margin-bottom: 0 !important;
-                        }
-                    </style>
-                    """,
-                    unsafe_allow_html=True
-                )
-                
                 st.markdown('<div class="export-sidebar">', unsafe_allow_html=True)
-                # 选择要导出的数据类型 - 与页面显示保持一致
-                export_type = st.selectbox(
-                    "选择数据类型",
-                    ["表明细", "列明细", "度量值", "表关系", "全部导出"],
-                    index=4  # 默认选择"全部导出"
-                )
-                # 选择导出格式
-                export_format = st.selectbox(
-                    "选择导出格式",
-                    ["CSV", "Excel"],
-                    index=1  # 默认选择"Excel"
-                )
-                
-                # 添加隐藏的会话状态变量用于跟踪下载状态
-                if "export_data" not in st.session_state:
-                    st.session_state.export_data = None
-                if "export_filename" not in st.session_state:
-                    st.session_state.export_filename = None
-                if "export_mime" not in st.session_state:
-                    st.session_state.export_mime = None
-                if "export_ready" not in st.session_state:
-                    st.session_state.export_ready = False
+                # 导出选项放在表单中，修改选项不会触发整页重跑，点击"开始导出"时一并提交
+                with st.form("export_form", clear_on_submit=False):
+                    # 选择要导出的数据类型 - 与页面显示保持一致
+                    export_type = st.selectbox(
+                        "选择数据类型",
+                        ["表明细", "列明细", "度量值", "表关系", "全部导出"],
+                        index=4  # 默认选择"全部导出"
+                    )
+                    # 选择导出格式
+                    export_format = st.selectbox(
+                        "选择导出格式",
+                        ["CSV", "Excel"],
+                        index=1  # 默认选择"Excel"
+                    )
+                    # 已安装 zstandard 时，全部导出的CSV可改用 zstd 压缩的 tar 包
+                    use_zstd = False
+                    if zstandard is not None:
+                        use_zstd = st.checkbox("使用 Zstd 压缩 (.tar.zst)", value=False, help="仅对「全部导出」的 CSV 格式生效")
+                    submitted = st.form_submit_button("开始导出", use_container_width=True)
+                use_zstd = use_zstd and export_type == "全部导出" and export_format == "CSV"
                 
                 # 导出按钮：较为稳健的实现，Excel 尽量延迟使用 openpyxl，否则回退为 CSV ZIP
-                if st.button("开始导出", use_container_width=True):
+                # 下载按钮不能放在表单内，因此在表单外处理提交
+                if submitted:
                     try:
-                        if export_type == "全部导出":
-                            sheet_data = [
-                                ('表明细', data['overview']),
-                                ('列明细', data['columns']),
-                                ('度量值', data['measures']),
-                                ('表关系', data['relationships'])
-                            ]
-
-                            # 如果用户选择 Excel，但 openpyxl 不可用 -> 回退为 CSV ZIP
-                            if export_format == 'Excel' and not _OPENPYXL_AVAILABLE:
-                                st.warning("当前环境未安装 openpyxl，已退回为 CSV 压缩包导出。若需 Excel 输出，请安装 openpyxl 并重试。")
+                        if export_format == 'Excel' and not (_OPENPYXL_AVAILABLE or _XLSXWRITER_AVAILABLE):
+                            if export_type == "全部导出":
+                                # 如果用户选择 Excel，但 openpyxl 不可用 -> 回退为 CSV ZIP
+                                st.warning("当前环境未安装 openpyxl 或 xlsxwriter，已退回为 CSV 压缩包导出。若需 Excel 输出，请安装 openpyxl 并重试。")
                                 export_format = 'CSV'
-
-                            if export_format == 'CSV':
-                                zip_buffer = io.BytesIO()
-                                with zipfile.ZipFile(zip_buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
-                                    for sheet_name, sheet_rows in sheet_data:
-                                        df_sheet = pd.DataFrame(sheet_rows)
-                                        csv_bytes = df_sheet.to_csv(index=False).encode('utf-8')
-                                        zf.writestr(f"{sheet_name}.csv", csv_bytes)
-
-                                zip_buffer.seek(0)
-                                filename = f"bi_model_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-                                st.success("✅ 数据准备完成，点击下方按钮下载")
-                                st.download_button("⬇️ 下载 ZIP (CSV)", data=zip_buffer.getvalue(), file_name=filename, mime='application/zip')
                             else:
-                                output = io.BytesIO()
-                                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                                    for sheet_name, sheet_rows in sheet_data:
-                                        df_sheet = pd.DataFrame(sheet_rows)
-                                        df_sheet.to_excel(writer, sheet_name=sheet_name[:31], index=False)
-
-                                output.seek(0)
-                                filename = f"bi_model_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                                st.success("✅ 数据准备完成，点击下方按钮下载")
-                                st.download_button("⬇️ 下载 Excel", data=output.getvalue(), file_name=filename, mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-                                st.markdown("<style>.stSidebar [data-testid='stVerticalBlock'] {gap: 0.2rem;}</style>", unsafe_allow_html=True)
-                        else:
-                            # 导出特定类型（表明细/列明细/度量值/表关系）
-                            if export_type == "表明细":
-                                export_df = pd.DataFrame(data['overview'])
-                                export_df.insert(0, '序号', range(1, len(export_df) + 1))
-                                file_name = f"表明细_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                            elif export_type == "列明细":
-                                export_df = pd.DataFrame(data['columns'])
-                                export_df.insert(0, '序号', range(1, len(export_df) + 1))
-                                if 'column_search' in st.session_state and st.session_state['column_search']:
-                                    search_term = st.session_state['column_search']
-                                    export_df = export_df[
-                                        export_df['表名'].str.contains(search_term, case=False, na=False) |
-                                        export_df['列名'].str.contains(search_term, case=False, na=False) |
-                                        export_df['源列名'].str.contains(search_term, case=False, na=False) |
-                                        export_df.get('列描述', '').str.contains(search_term, case=False, na=False)
-                                    ]
-                                file_name = f"列明细_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                            elif export_type == "度量值":
-                                export_df = pd.DataFrame(data['measures'])
-                                export_df.insert(0, '序号', range(1, len(export_df) + 1))
-                                if 'measure_search' in st.session_state and st.session_state['measure_search']:
-                                    search_term = st.session_state['measure_search']
-                                    export_df = export_df[
-                                        export_df['度量值名称'].str.contains(search_term, case=False, na=False) |
-                                        export_df['度量值计算逻辑'].str.contains(search_term, case=False, na=False) |
-                                        export_df['度量值涉及表'].str.contains(search_term, case=False, na=False)
-                                    ]
-                                file_name = f"度量值_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                            elif export_type == "表关系":
-                                export_df = pd.DataFrame(data['relationships'])
-                                export_df.insert(0, '序号', range(1, len(export_df) + 1))
-                                if 'relationship_search' in st.session_state and st.session_state['relationship_search']:
-                                    search_term = st.session_state['relationship_search']
-                                    export_df = export_df[
-                                        export_df['源表名'].str.contains(search_term, case=False, na=False) |
-                                        export_df['目标表名'].str.contains(search_term, case=False, na=False) |
-                                        export_df['源表字段'].str.contains(search_term, case=False, na=False) |
-                                        export_df['目标表字段'].str.contains(search_term, case=False, na=False)
-                                    ]
-                                file_name = f"表关系_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-
-                            # 输出为 CSV 或 Excel
-                            if export_format == "CSV":
-                                csv_data = export_df.to_csv(index=False, encoding='utf-8-sig')
-                                st.session_state.export_data = csv_data
-                                st.session_state.export_filename = f"{file_name}.csv"
-                                st.session_state.export_mime = "text/csv"
-                                st.session_state.export_ready = True
-                            else:
-                                if not _OPENPYXL_AVAILABLE:
-                                    st.error("导出 Excel 需要安装 openpyxl。请在运行环境中安装后重试。")
-                                    raise RuntimeError("openpyxl 不可用")
-
-                                output = io.BytesIO()
-                                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                                    export_df.to_excel(writer, index=False)
-
-                                output.seek(0)
-                                st.session_state.export_data = output.getvalue()
-                                st.session_state.export_filename = f"{file_name}.xlsx"
-                                st.session_state.export_mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                                st.session_state.export_ready = True
-
-                            # 显示下载按钮
-                            st.success("✅ 数据准备完成，点击下方按钮下载")
-                            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                            if export_format == "CSV":
-                                st.download_button(
-                                    label=f"下载 {export_type}.csv",
-                                    data=st.session_state.export_data,
-                                    file_name=f"BI模型解析数据_{export_type}_{timestamp}.csv",
-                                    mime="text/csv",
-                                    use_container_width=True,
-                                    key=f"download_csv_{datetime.now().timestamp()}"
-                                )
+                                st.error("导出 Excel 需要安装 openpyxl 或 xlsxwriter。请在运行环境中安装后重试。")
+                                raise RuntimeError("openpyxl 不可用")
+                        
+                        # 导出内容按 (解析结果, 导出类型, 导出格式) 缓存，重复导出或重新下载无需再次生成
+                        # 单类导出与页面显示保持一致：该标签页有搜索词时只导出命中的行
+                        row_filter = None
+                        if export_type != "全部导出":
+                            filtered_idx = st.session_state.get(f"{_EXPORT_KINDS[export_type]}_filtered_idx")
+                            if filtered_idx is not None and filtered_idx[0] == parsed_id:
+                                shown_term = filtered_idx[1]
+                                row_filter = filtered_idx[2:]
+                        
+                        # 行数较多时显示导出进度，每写完一块更新一次；命中缓存时不会回报，进度条随后清除
+                        export_kinds = list(_EXPORT_KINDS.values()) if export_type == "全部导出" else [_EXPORT_KINDS[export_type]]
+                        export_total = sum(_row_count(data[kind]) for kind in export_kinds)
+                        if row_filter is not None:
+                            export_total = len(row_filter[1])
+                        on_rows = None
+                        if export_total > _EXPORT_CHUNK_ROWS:
+                            progress_bar = st.progress(0.0, text="正在导出...")
+                            exported = [0]
+                            def _report_progress(count: int) -> None:
+                                exported[0] += count
+                                progress_bar.progress(min(1.0, exported[0] / export_total), text=f"正在导出... {exported[0]}/{export_total}")
+                            on_rows = _report_progress
+                        export_bytes, export_mime = _build_export_bytes(parsed_id, export_type, export_format, data, use_zstd, on_rows, row_filter)
+                        if on_rows is not None:
+                            progress_bar.empty()
+                        
+                        # 显示下载按钮
+                        st.success("✅ 数据准备完成，点击下方按钮下载")
+                        if row_filter is not None:
+                            st.caption(f"已按搜索词「{shown_term}」筛选，共 {len(row_filter[1])} 条")
+                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                        # 导出内容完全由解析结果、导出选项和搜索词决定，用它们组成稳定的 key，重跑时不重建下载按钮
+                        download_key = f"dl_{export_format}_{export_type}_{'zst_' if use_zstd else ''}{parsed_id}"
+                        if row_filter is not None:
+                            download_key += f"_{row_filter[0]}"
+                        if export_type == "全部导出":
+                            if export_format == 'CSV' and use_zstd:
+                                st.download_button("⬇️ 下载 TAR.ZST (CSV)", data=export_bytes, file_name=f"bi_model_export_{timestamp}.tar.zst", mime=export_mime, key=download_key)
+                            elif export_format == 'CSV':
+                                st.download_button("⬇️ 下载 ZIP (CSV)", data=export_bytes, file_name=f"bi_model_export_{timestamp}.zip", mime=export_mime, key=download_key)
                             else:
-                                st.download_button(
-                                    label=f"下载 {export_type}.xlsx",
-                                    data=st.session_state.export_data,
-                                    file_name=f"BI模型解析数据_{export_type}_{timestamp}.xlsx",
-                                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                    use_container_width=True,
-                                    key=f"download_excel_{datetime.now().timestamp()}"
-                                )
-                                st.markdown("<style>.stSidebar [data-testid='stVerticalBlock'] {gap: 0.2rem;}</style>", unsafe_allow_html=True)
+                                st.download_button("⬇️ 下载 Excel", data=export_bytes, file_name=f"bi_model_export_{timestamp}.xlsx", mime=export_mime, key=download_key)
+                        elif export_format == "CSV":
+                            st.download_button(
+                                label=f"下载 {export_type}.csv",
+                                data=export_bytes,
+                                file_name=f"BI模型解析数据_{export_type}_{timestamp}.csv",
+                                mime=export_mime,
+                                use_container_width=True,
+                                key=download_key
+                            )
+                        else:
+                            st.download_button(
+                                label=f"下载 {export_type}.xlsx",
+                                data=export_bytes,
+                                file_name=f"BI模型解析数据_{export_type}_{timestamp}.xlsx",
+                                mime=export_mime,
+                                use_container_width=True,
+                                key=download_key
+                            )
                     except Exception as e:
                         st.error(f"❌ 导出失败: {str(e)}")
 